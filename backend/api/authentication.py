@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+# Claims copied from the User into every token issued by /api/token/. Only
+# identity for display: permissions such as is_staff are never trusted from
+# a token, since a refresh token (and so its claims) lives for a day.
+USER_CLAIMS = ('username', 'email')
+
+
+def set_user_claims(token, user):
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Issues tokens that also carry the user's username and email."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        set_user_claims(token, user)
+        return token
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Re-reads the claims from the User on every refresh, so an access token
+    never carries claims older than ACCESS_TOKEN_LIFETIME, and refuses
+    deleted or inactive users.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user = User.objects.filter(pk=refresh.payload.get(api_settings.USER_ID_CLAIM)).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+        set_user_claims(refresh, user)
+        return super().validate({**attrs, "refresh": str(refresh)})
+
+
+class ClaimsTokenUser(TokenUser):
+    """TokenUser whose id is an int, like User.id, rather than the claim's string."""
+
+    @cached_property
+    def id(self):
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def pk(self):
+        return self.id
+
+
+class CachedUserJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that loads the User (active users only) and reuses
+    it for JWT_USER_CACHE_TIMEOUT seconds, so is_staff and is_active are at
+    most that stale. For read-only views that check permissions.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        key = f"jwt-user:{user_id}"
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, getattr(settings, 'JWT_USER_CACHE_TIMEOUT', 60))
+        return user
+
+
+class ClaimsJWTAuthentication(CachedUserJWTAuthentication):
+    """
+    JWT authentication that builds request.user from the token's claims
+    instead of loading the User row. Tokens issued before the claims were
+    added fall back to the cached User.
+
+    The claims are at most ACCESS_TOKEN_LIFETIME old (refreshing re-reads
+    them), request.user is not a model instance and is never staff, so use
+    it only on read-only endpoints that need no more than id, username and
+    email and grant no extra rights.
+    """
+
+    def get_user(self, validated_token):
+        if all(claim in validated_token for claim in USER_CLAIMS):
+            # TokenUser reads id, username and email off the token
+            return ClaimsTokenUser(validated_token)
+        return super().get_user(validated_token)
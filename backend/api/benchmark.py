@@ -0,0 +1,239 @@
+import asyncio
+import platform
+import statistics
+import subprocess
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+
+import django
+import httpx
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from .authentication import ClaimsTokenObtainPairSerializer
+from .models import Booking, Venue
+from .querycount import record_queries
+from .synthetic import generate
+
+# Dates are fixed so that runs on different days stay comparable
+ANCHOR = date(2030, 1, 1)
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+def _day(day):
+    return day.strftime("%Y-%m-%d")
+
+
+# name -> (method, url, body, expected status); built from the sample rows in `ctx`
+ENDPOINTS = {
+    "venues-list": lambda ctx: ("get", "/api/venues/", None, 200),
+    "venues-list-page": lambda ctx: ("get", "/api/venues/?page_size=50", None, 200),
+    "venue-detail": lambda ctx: ("get", f"/api/venues/id/{ctx['venue']}/", None, 200),
+    "owner-venues": lambda ctx: ("get", f"/api/venues/owner/{ctx['owner']}/", None, 200),
+    "venues-available": lambda ctx: (
+        "get", f"/api/venues/available/?start={_day(ANCHOR + timedelta(days=30))}"
+               f"&end={_day(ANCHOR + timedelta(days=32))}", None, 200),
+    "venues-search": lambda ctx: ("get", "/api/venues/search/?q=garden%20parking", None, 200),
+    "venue-calendar": lambda ctx: (
+        "get", f"/api/venues/{ctx['venue']}/calendar/?from={_day(ANCHOR)}&months=3", None, 200),
+    "bookings-list": lambda ctx: ("get", "/api/bookings/", None, 200),
+    "bookings-page": lambda ctx: ("get", "/api/bookings/?page_size=50", None, 200),
+    "user-bookings": lambda ctx: ("get", f"/api/userbookings/{ctx['guest']}/", None, 200),
+    "owner-stats": lambda ctx: (
+        "get", f"/api/owners/{ctx['owner']}/stats/?from={_day(ANCHOR)}"
+               f"&to={_day(ANCHOR + timedelta(days=89))}", None, 200),
+    # A booking that clashes with an existing one: runs the overlap check, writes nothing
+    "overlap-check": lambda ctx: ("post", "/api/bookings/", {
+        "venue": ctx['venue'], "user": ctx['guest'],
+        "start_date": ctx['booked_day'], "end_date": ctx['booked_day']}, 400),
+}
+
+
+def parse_size(text):
+    """'venues:users:bookings', e.g. '100:200:1000'."""
+    venues, users, bookings = (int(part) for part in text.split(":"))
+    return {"venues": venues, "users": users, "bookings": bookings}
+
+
+def percentile(sorted_values, pct):
+    # Nearest rank, so small samples report a value that was actually seen
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def sample_rows():
+    """The busiest venue, its owner and its busiest guest, for the URLs above."""
+    venue = Venue.objects.annotate(n=Count('booking')).order_by('-n', 'venueid').first()
+    booking = Booking.objects.filter(venue=venue).order_by('start_date').first()
+    guest = (Booking.objects.values('user_id').annotate(n=Count('id'))
+             .order_by('-n', 'user_id').first())
+    return {
+        "venue": venue.venueid,
+        "owner": venue.venueownerid_id,
+        "guest": guest['user_id'],
+        "booked_day": _day(booking.start_date),
+    }
+
+
+def measure(client, method, url, body, repeat, warmup=2):
+    """Time `repeat` calls after `warmup` untimed ones; return the summary."""
+    if method == "post":
+        def call():
+            return client.post(url, body, format='json')
+    else:
+        def call():
+            return client.get(url)
+    for _ in range(warmup):
+        call()
+    timings, queries = [], []
+    for _ in range(repeat):
+        with record_queries() as recorded:
+            started = time.perf_counter()
+            response = call()
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(recorded.count)
+    timings.sort()
+    return {
+        "status": response.status_code,
+        "queries": max(queries),
+        "bytes": len(response.content),
+        "mean_ms": round(statistics.fmean(timings), 2),
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "p99_ms": round(percentile(timings, 99), 2),
+    }
+
+
+def run_size(size, repeat, seed, endpoints, cache=False):
+    """Empty the database, generate `size` rows and measure each endpoint."""
+    call_command('flush', interactive=False, verbosity=0)
+    started = time.perf_counter()
+    generated = generate(**size, seed=seed, anchor=ANCHOR, prefix="bench")
+    generated["seconds"] = round(time.perf_counter() - started, 2)
+
+    ctx = sample_rows()
+    owner = User.objects.get(pk=ctx['owner'])
+    client = APIClient()
+    results = {}
+    # Production runs without the per-request query stats middleware
+    overrides = {'QUERY_STATS': False} if cache else {'QUERY_STATS': False, 'CACHES': NO_CACHE}
+    with override_settings(**overrides):
+        for name in endpoints:
+            method, url, body, expected = ENDPOINTS[name](ctx)
+            # A real token, fresh per endpoint, so the JWT authentication runs as in production
+            access = ClaimsTokenObtainPairSerializer.get_token(owner).access_token
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+            results[name] = measure(client, method, url, body, repeat)
+            results[name]["expected_status"] = expected
+    return {"size": size, "generated": generated, "endpoints": results}
+
+
+async def _load_test(url, requests, concurrency, warmup, token):
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    semaphore = asyncio.Semaphore(concurrency)
+    timings, statuses = [], Counter()
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+        async def one(record=True):
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url, headers=headers)
+                    outcome = response.status_code
+                except httpx.HTTPError as e:
+                    outcome = type(e).__name__
+                if record:
+                    statuses[outcome] += 1
+                    timings.append((time.perf_counter() - started) * 1000)
+
+        await asyncio.gather(*(one(record=False) for _ in range(warmup)))
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    timings.sort()
+    return {
+        "url": url,
+        "requests": requests,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "p99_ms": round(percentile(timings, 99), 2),
+        "statuses": {str(outcome): count for outcome, count in statuses.items()},
+    }
+
+
+def load_test(url, requests=2000, concurrency=16, warmup=50, token=None):
+    """
+    Send concurrent GETs to `url` on a running server and return requests
+    per second, latency percentiles and the status codes seen. Measures the
+    whole deployment (workers, connection handling) rather than one view.
+    """
+    return asyncio.run(_load_test(url, requests, concurrency, warmup, token))
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(sizes, repeat=20, seed=0, endpoints=None, cache=False, progress=None):
+    """
+    Measure every endpoint at every dataset size. Returns a JSON-ready dict;
+    without `cache` each call misses the response cache and hits the database.
+    """
+    endpoints = endpoints or list(ENDPOINTS)
+    runs = []
+    for size in sizes:
+        runs.append(run_size(size, repeat, seed, endpoints, cache))
+        if progress:
+            progress(runs[-1])
+    return {
+        "schema": 1,
+        "commit": git_commit(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "seed": seed,
+        "repeat": repeat,
+        "cache": cache,
+        "runs": runs,
+    }
+
+
+def compare(baseline, current, threshold=0.25, min_ms=1.0):
+    """
+    Lines describing each endpoint and size measured in both results whose
+    p50 grew by more than `threshold` (and `min_ms`, to ignore noise on
+    fast calls), which runs more queries or which now answers with a
+    different status.
+    """
+    def by_key(results):
+        return {(tuple(sorted(run["size"].items())), name): stats
+                for run in results["runs"] for name, stats in run["endpoints"].items()}
+
+    old, new = by_key(baseline), by_key(current)
+    regressions = []
+    for key in sorted(old.keys() & new.keys()):
+        before, after = old[key], new[key]
+        label = f"{key[1]} @ {dict(key[0])}"
+        if after["status"] != before["status"]:
+            regressions.append(f"{label}: status {before['status']} -> {after['status']}")
+        if after["queries"] > before["queries"]:
+            regressions.append(f"{label}: queries {before['queries']} -> {after['queries']}")
+        if (after["p50_ms"] > before["p50_ms"] * (1 + threshold)
+                and after["p50_ms"] - before["p50_ms"] > min_ms):
+            regressions.append(f"{label}: p50 {before['p50_ms']}ms -> {after['p50_ms']}ms")
+    return regressions
@@ -0,0 +1,104 @@
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from .conditional import conditional_response, not_modified
+
+STATS_KEY = 'response-cache-stats'
+
+
+def _new_version():
+    # Never reuse an old number if a version key gets evicted
+    return time.time_ns()
+
+
+def get_version(namespace, key):
+    """Current version number of a cached resource."""
+    return cache.get_or_set(f"{namespace}-version:{key}", _new_version, timeout=None)
+
+
+def bump_version(namespace, key):
+    """
+    Invalidate every cache entry built from `namespace`/`key` by moving it
+    to a new version. Entries of older versions are never read again and
+    expire after their own timeout.
+    """
+    version_key = f"{namespace}-version:{key}"
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.set(version_key, _new_version(), timeout=None)
+
+
+def versioned_key(namespace, key, *parts):
+    version = get_version(namespace, key)
+    return ":".join([namespace, str(key), str(version), *map(str, parts)])
+
+
+def query_key(request):
+    """The request's query string in a stable order, for use in cache keys."""
+    return urlencode(sorted(request.query_params.lists()), doseq=True)
+
+
+def invalidate_venue(venue_id, *owner_ids):
+    """Drop the cached detail of a venue and the lists it appears in."""
+    bump_version('venue', venue_id)
+    bump_version('venue-list', 'all')
+    for owner_id in set(owner_ids):
+        if owner_id is not None:
+            bump_version('venue-list', owner_id)
+
+
+def _record(outcome):
+    key = f"{STATS_KEY}:{outcome}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def cache_stats():
+    hits = cache.get(f"{STATS_KEY}:hits", 0)
+    misses = cache.get(f"{STATS_KEY}:misses", 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / total if total else None,
+    }
+
+
+def cached_response(request, key, build, etag_func=None, timeout=None):
+    """
+    Serve the data cached under `key`, or call `build()` for a Response and
+    cache its data if it succeeded. Sets an X-Cache header either way.
+
+    With `etag_func` the ETag is cached next to the data, so conditional
+    requests that hit the cache are answered without touching the database.
+    `timeout` defaults to RESPONSE_CACHE_TIMEOUT.
+    """
+    entry = cache.get(key)
+    if entry is not None:
+        _record('hits')
+        etag, data = entry
+        response = not_modified(request, etag) if etag else None
+        if response is None:
+            response = Response(data)
+            if etag:
+                response['ETag'] = etag
+        response['X-Cache'] = 'HIT'
+        return response
+
+    _record('misses')
+    etag = etag_func() if etag_func else None
+    if etag:
+        response = conditional_response(request, etag, build)
+    else:
+        response = build()
+    if response.status_code == 200:
+        cache.set(key, (etag, response.data), timeout or settings.RESPONSE_CACHE_TIMEOUT)
+    response['X-Cache'] = 'MISS'
+    return response
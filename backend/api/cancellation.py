@@ -0,0 +1,46 @@
+from django.db import router, transaction
+from django.db.models import Q
+from django.db.models.deletion import Collector
+
+from .models import Booking, CanceledBooking
+
+
+def cancellable_bookings(user):
+    """Bookings `user` may cancel: their own and those at venues they own."""
+    bookings = Booking.objects.select_related('venue', 'user')
+    if user.is_staff:
+        return bookings
+    return bookings.filter(Q(user=user) | Q(venue__venueownerid=user))
+
+
+def cancel_bookings(user, booking_ids, reason=None):
+    """
+    Move the bookings `user` may cancel among `booking_ids` into
+    CanceledBooking and delete them, all in one transaction. Returns
+    {booking_id: canceled_booking} for the ones that were canceled.
+    """
+    with transaction.atomic():
+        bookings = list(cancellable_bookings(user).filter(
+            id__in=booking_ids).select_for_update(of=('self',)).order_by('id'))
+        if not bookings:
+            return {}
+
+        canceled = CanceledBooking.objects.bulk_create([
+            CanceledBooking(
+                venue_name=booking.venue.venuename,
+                venue_address=booking.venue.venueaddress,
+                user_id=booking.user_id,
+                user_name=booking.user.username,
+                start_date=booking.start_date,
+                end_date=booking.end_date,
+                reason=reason,
+            )
+            for booking in bookings
+        ])
+        # Collecting the loaded bookings (rather than a queryset) hands the
+        # post_delete receivers instances that already carry their venue
+        ids = [booking.id for booking in bookings]
+        collector = Collector(using=router.db_for_write(Booking))
+        collector.collect(bookings)
+        collector.delete()
+    return dict(zip(ids, canceled))
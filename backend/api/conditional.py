@@ -0,0 +1,60 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import Booking
+
+
+def make_etag(*parts):
+    """Strong ETag from the change markers a response was built from."""
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+    return quote_etag(digest)
+
+
+def _table_version(queryset, *related):
+    # Row count catches deletions, which leave no timestamp behind
+    aggregates = {'count': Count('pk'), 'last': Max('updated_at')}
+    for path in related:
+        aggregates[path] = Max(f'{path}__updated_at')
+    return tuple(sorted(queryset.aggregate(**aggregates).items()))
+
+
+def venues_etag(venues, query=''):
+    """ETag of a venue listing and the bookings behind its booked_dates."""
+    bookings = Booking.objects.filter(venue__in=venues.values('pk'))
+    return make_etag(_table_version(venues), _table_version(bookings), query)
+
+
+def user_bookings_etag(bookings, query=''):
+    """ETag of a booking listing, including the venues and booker profiles it names."""
+    return make_etag(_table_version(bookings, 'venue', 'user__profile'), query)
+
+
+def not_modified(request, etag):
+    """A 304 response if the client already holds `etag`, else None."""
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        client_etags = parse_etags(if_none_match)
+        if etag in client_etags or '*' in client_etags:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            response['ETag'] = etag
+            return response
+    return None
+
+
+def conditional_response(request, etag, build):
+    """
+    Answer 304 if the client already holds `etag`, otherwise call `build()`
+    and tag the response. Nothing is serialized on a match.
+    """
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+
+    response = build()
+    if response.status_code == status.HTTP_200_OK:
+        response['ETag'] = etag
+    return response
@@ -0,0 +1,75 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+
+from .models import Booking, CanceledBooking
+
+# Rows fetched per database round trip (a server-side cursor on
+# PostgreSQL) and rows joined into each chunk sent to the client.
+EXPORT_CHUNK_SIZE = 2000
+
+BOOKING_COLUMNS = ['id', 'venue_id', 'venue_name', 'user_id', 'start_date',
+                   'end_date', 'verified', 'updated_at']
+CANCELED_BOOKING_COLUMNS = ['id', 'venue_name', 'venue_address', 'user_id', 'user_name',
+                            'start_date', 'end_date', 'canceled_at', 'reason']
+
+
+def _in_window(queryset, start_date, end_date):
+    # Rows whose stay starts inside [start_date, end_date]
+    if start_date:
+        queryset = queryset.filter(start_date__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(start_date__lte=end_date)
+    return queryset
+
+
+def booking_rows(start_date=None, end_date=None):
+    bookings = Booking.objects.order_by('id').values(
+        'id', 'venue_id', 'user_id', 'start_date', 'end_date', 'verified', 'updated_at',
+        venue_name=F('venue__venuename'))
+    return _in_window(bookings, start_date, end_date).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def canceled_booking_rows(start_date=None, end_date=None):
+    canceled = CanceledBooking.objects.order_by('id').values(*CANCELED_BOOKING_COLUMNS)
+    return _in_window(canceled, start_date, end_date).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+class _Echo:
+    """File-like object that hands back what csv.writer writes to it."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows, columns):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([row[column] for column in columns])
+
+
+def ndjson_lines(rows, columns):
+    for row in rows:
+        yield json.dumps({column: row[column] for column in columns},
+                         cls=DjangoJSONEncoder) + "\n"
+
+
+def chunked(lines, size=EXPORT_CHUNK_SIZE):
+    """Join lines into larger pieces so each write to the client carries many rows."""
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= size:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+
+ENCODINGS = {
+    'ndjson': (ndjson_lines, 'application/x-ndjson'),
+    'csv': (csv_lines, 'text/csv'),
+}
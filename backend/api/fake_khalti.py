@@ -0,0 +1,87 @@
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+INITIATE_PATH = "/api/v2/epayment/initiate/"
+
+
+class FakeKhaltiHandler(BaseHTTPRequestHandler):
+    """Answers Khalti's initiate call after `server.delay` seconds."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        self.server.record_request()
+
+        if self.path != INITIATE_PATH:
+            return self._reply(404, {"detail": "Not found."})
+        if not self.headers.get("Authorization", "").startswith("Key "):
+            return self._reply(401, {"detail": "Invalid token."})
+
+        time.sleep(self.server.delay)
+        if random.random() < self.server.failure_rate:
+            return self._reply(503, {"detail": "Service unavailable."})
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return self._reply(400, {"detail": "Invalid JSON."})
+
+        pidx = uuid.uuid4().hex
+        self._reply(200, {
+            "pidx": pidx,
+            "payment_url": f"http://{self.server.public_host}/pay/?pidx={pidx}",
+            "purchase_order_id": payload.get("purchase_order_id"),
+            "expires_in": 1800,
+        })
+
+    def _reply(self, status_code, data):
+        body = json.dumps(data).encode()
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class FakeKhaltiServer(ThreadingHTTPServer):
+    """
+    Local stand-in for Khalti's initiate endpoint with configurable latency
+    and failure rate, for offline load and timeout testing.
+    """
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, delay=0.0, failure_rate=0.0, verbose=False):
+        super().__init__((host, port), FakeKhaltiHandler)
+        self.delay = delay
+        self.failure_rate = failure_rate
+        self.verbose = verbose
+        self.request_count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def public_host(self):
+        host, port = self.server_address[:2]
+        return f"{host}:{port}"
+
+    @property
+    def initiate_url(self):
+        return f"http://{self.public_host}{INITIATE_PATH}"
+
+    def record_request(self):
+        with self._lock:
+            self.request_count += 1
+
+    def start_in_thread(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,43 @@
+from decimal import Decimal, InvalidOperation
+
+from rest_framework.exceptions import ValidationError
+
+# ?ordering= values and the index-backed order each one maps to. venueid
+# breaks ties so pages are stable.
+VENUE_ORDERINGS = {
+    'price': ('min_price', 'venueid'),
+    '-price': ('-min_price', 'venueid'),
+    'capacity': ('max_capacity', 'venueid'),
+    '-capacity': ('-max_capacity', 'venueid'),
+}
+DEFAULT_VENUE_ORDERING = ('venueid',)
+
+
+def venue_ordering(params):
+    ordering = params.get('ordering')
+    if not ordering:
+        return DEFAULT_VENUE_ORDERING
+    if ordering not in VENUE_ORDERINGS:
+        raise ValidationError(
+            {"ordering": f"Choose one of: {', '.join(VENUE_ORDERINGS)}."})
+    return VENUE_ORDERINGS[ordering]
+
+
+def filter_venues(venues, params):
+    """
+    Apply ?min_capacity=, ?price_gte=, ?price_lte= (on the starting price,
+    min_price) and ?ordering= to a venue queryset.
+    """
+    filters = {}
+    try:
+        if params.get('min_capacity'):
+            filters['max_capacity__gte'] = int(params['min_capacity'])
+        if params.get('price_gte'):
+            filters['min_price__gte'] = Decimal(params['price_gte'])
+        if params.get('price_lte'):
+            filters['min_price__lte'] = Decimal(params['price_lte'])
+    except (ValueError, InvalidOperation):
+        raise ValidationError(
+            {"detail": "min_capacity, price_gte and price_lte must be numbers."})
+
+    return venues.filter(**filters).order_by(*venue_ordering(params))
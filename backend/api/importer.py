@@ -0,0 +1,197 @@
+import csv
+import json
+from collections import defaultdict
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from .caching import bump_version, invalidate_venue
+from .models import Booking, Venue
+from .occupancy import record_occupancy
+from .serializers import BOOKING_CONFLICT_MESSAGE, BookingImportSerializer, VenueImportSerializer
+
+
+def read_rows(stream, fmt):
+    """
+    Yield (line_number, row, error) for each record of a CSV (with a header)
+    or JSON Lines stream, one at a time. Empty CSV cells are left out so the
+    model defaults apply.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, {k: v for k, v in row.items() if v not in ('', None)}, None
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, {"non_field_errors": [f"Invalid JSON: {e}"]}
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, {"non_field_errors": ["Expected a JSON object."]}
+            continue
+        yield line_number, row, None
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _missing(pk):
+    return [f'Invalid pk "{pk}" - object does not exist.']
+
+
+def _write(model, objects):
+    """
+    Insert `objects` in one transaction. If a concurrent write makes the
+    batch fail, fall back to row-by-row inserts and return what was saved
+    plus the objects that were refused.
+    """
+    try:
+        with transaction.atomic():
+            model.objects.bulk_create(objects)
+        return objects, []
+    except IntegrityError:
+        pass
+
+    saved, refused = [], []
+    for obj in objects:
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create([obj])
+            saved.append(obj)
+        except IntegrityError:
+            refused.append(obj)
+    return saved, refused
+
+
+def import_venues(rows):
+    """
+    Validate and insert one batch of venue rows. Returns the number saved
+    and a list of (line_number, errors) for the rejected rows.
+    """
+    valid, rejected = [], []
+    for line_number, row, error in rows:
+        serializer = None if error else VenueImportSerializer(data=row)
+        if serializer is not None and serializer.is_valid():
+            valid.append((line_number, serializer.validated_data))
+        else:
+            rejected.append((line_number, error or serializer.errors))
+
+    owner_ids = set(User.objects.filter(
+        pk__in={data['venueownerid'] for _, data in valid}).values_list('id', flat=True))
+    venues, lines = [], {}
+    for line_number, data in valid:
+        data = dict(data)
+        owner_id = data.pop('venueownerid')
+        if owner_id not in owner_ids:
+            rejected.append((line_number, {"venueownerid": _missing(owner_id)}))
+            continue
+        venue = Venue(venueownerid_id=owner_id, **data)
+        venues.append(venue)
+        lines[id(venue)] = line_number
+
+    saved, refused = _write(Venue, venues)
+    rejected.extend((lines[id(venue)], {"non_field_errors": ["Could not be saved."]})
+                    for venue in refused)
+
+    # bulk_create() sends no post_save, so the cached lists are dropped here
+    if saved:
+        bump_version('venue-list', 'all')
+        for owner_id in {venue.venueownerid_id for venue in saved}:
+            bump_version('venue-list', owner_id)
+    return len(saved), sorted(rejected, key=lambda item: item[0])
+
+
+def _periods(valid, venue_ids):
+    """The batch's date ranges per venue, with overlapping ones merged."""
+    ranges = defaultdict(list)
+    for _, data in valid:
+        if data['venue'] in venue_ids:
+            ranges[data['venue']].append((data['start_date'], data['end_date']))
+    merged = []
+    for venue_id, periods in ranges.items():
+        periods.sort()
+        start, end = periods[0]
+        for next_start, next_end in periods[1:]:
+            if next_start > end:
+                merged.append((venue_id, start, end))
+                start = next_start
+            end = max(end, next_end)
+        merged.append((venue_id, start, end))
+    return merged
+
+
+def import_bookings(rows):
+    """
+    Validate and insert one batch of booking rows. Date conflicts, with
+    stored bookings and within the batch, are checked with one query for
+    the whole batch rather than one per row; it only loads bookings that
+    overlap a row of the batch.
+    """
+    valid, rejected = [], []
+    for line_number, row, error in rows:
+        serializer = None if error else BookingImportSerializer(data=row)
+        if serializer is not None and serializer.is_valid():
+            valid.append((line_number, serializer.validated_data))
+        else:
+            rejected.append((line_number, error or serializer.errors))
+
+    owners = dict(Venue.objects.filter(
+        pk__in={data['venue'] for _, data in valid}).values_list('venueid', 'venueownerid'))
+    user_ids = set(User.objects.filter(
+        pk__in={data['user'] for _, data in valid}).values_list('id', flat=True))
+
+    taken = defaultdict(list)
+    periods = _periods(valid, owners)
+    if periods:
+        overlapping = Q()
+        for venue_id, start_date, end_date in periods:
+            overlapping |= Q(venue=venue_id, start_date__lte=end_date, end_date__gte=start_date)
+        stored = Booking.objects.filter(overlapping).values_list('venue_id', 'start_date', 'end_date')
+        for venue_id, start_date, end_date in stored:
+            taken[venue_id].append((start_date, end_date))
+
+    bookings, lines = [], {}
+    for line_number, data in valid:
+        if data['venue'] not in owners:
+            rejected.append((line_number, {"venue": _missing(data['venue'])}))
+            continue
+        if data['user'] not in user_ids:
+            rejected.append((line_number, {"user": _missing(data['user'])}))
+            continue
+        periods = taken[data['venue']]
+        if any(start <= data['end_date'] and end >= data['start_date'] for start, end in periods):
+            rejected.append((line_number, {"non_field_errors": [BOOKING_CONFLICT_MESSAGE]}))
+            continue
+        periods.append((data['start_date'], data['end_date']))
+        booking = Booking(venue_id=data['venue'], user_id=data['user'],
+                          start_date=data['start_date'], end_date=data['end_date'],
+                          verified=data.get('verified', False))
+        bookings.append(booking)
+        lines[id(booking)] = line_number
+
+    saved, refused = _write(Booking, bookings)
+    rejected.extend((lines[id(booking)], {"non_field_errors": [BOOKING_CONFLICT_MESSAGE]})
+                    for booking in refused)
+
+    # bulk_create() skips the signals that keep these in step
+    record_occupancy(saved)
+    for venue_id in {booking.venue_id for booking in saved}:
+        bump_version('venue-calendar', venue_id)
+        invalidate_venue(venue_id, owners[venue_id])
+    return len(saved), sorted(rejected, key=lambda item: item[0])
+
+
+IMPORTERS = {
+    'venues': import_venues,
+    'bookings': import_bookings,
+}
@@ -0,0 +1,347 @@
+import asyncio
+import uuid
+import weakref
+from datetime import datetime, timedelta
+
+import httpx
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+from .models import Booking, PaymentIntent, Venue
+
+# PaymentIntent.idempotency_key is a CharField(max_length=255)
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+
+class PaymentRequestError(Exception):
+    """The client's payment request cannot be served as sent."""
+
+    def __init__(self, detail, status_code=400):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+class KhaltiError(Exception):
+    """Khalti could not be reached or refused the initiation."""
+
+    def __init__(self, detail, status_code):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+def _timeouts():
+    return (getattr(settings, 'KHALTI_CONNECT_TIMEOUT', 3),
+            getattr(settings, 'KHALTI_READ_TIMEOUT', 10))
+
+
+def parse_payment_request(data):
+    user_id = data.get("user")
+    venue_id = data.get("venue")
+    start_date = data.get("start_date")
+    end_date = data.get("end_date")
+    # in paisa (eg: Rs 100 = 10000 paisa)
+    amount = data.get("amount")
+
+    if not all([user_id, venue_id, start_date, end_date, amount]):
+        raise PaymentRequestError("Missing fields")
+
+    try:
+        # Parse the dates
+        start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        raise PaymentRequestError("Invalid date format. Use YYYY-MM-DD.")
+
+    if start_date_obj > end_date_obj:
+        raise PaymentRequestError("End date must be after start date.")
+
+    try:
+        amount = int(amount)
+    except (TypeError, ValueError):
+        raise PaymentRequestError("Amount must be a whole number of paisa.")
+    if amount <= 0:
+        raise PaymentRequestError("Amount must be positive.")
+
+    try:
+        venue_id = int(venue_id)
+    except (TypeError, ValueError):
+        raise PaymentRequestError("Venue must be a venue id.")
+
+    return {
+        "user_id": user_id,
+        "venue_id": venue_id,
+        "start_date": start_date_obj,
+        "end_date": end_date_obj,
+        "amount": amount,
+    }
+
+
+def build_payload(payment, user, purchase_order_id):
+    return {
+        "return_url": "http://localhost:5173/payment-success",  # after payment where to go
+        "website_url": "http://localhost:5173",
+        "amount": payment["amount"],
+        "purchase_order_id": purchase_order_id,
+        "purchase_order_name": "Venue Booking",
+        "customer_info": {
+            "name": user.username,
+            "email": user.email,
+            "phone": "9800000000",  # Dummy phone, make dynamic if needed
+        }
+    }
+
+
+def _headers():
+    return {"Authorization": f"Key {settings.KHALTI_SECRET_KEY}"}
+
+
+def _initiation(status_code, data):
+    if status_code == 200 and "payment_url" in data:
+        return {"payment_url": data["payment_url"], "pidx": data.get("pidx")}
+    raise KhaltiError("Khalti payment initiation failed", 400)
+
+
+# One keep-alive connection pool shared by every sync request in the process
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_maxsize=getattr(settings, 'KHALTI_POOL_SIZE', 20)))
+_session.mount("http://", HTTPAdapter(pool_maxsize=getattr(settings, 'KHALTI_POOL_SIZE', 20)))
+
+
+def initiate(payload):
+    """Start a Khalti payment and return its payment_url and pidx."""
+    try:
+        response = _session.post(settings.KHALTI_INITIATE_URL, json=payload,
+                                 headers=_headers(), timeout=_timeouts())
+    except requests.Timeout:
+        raise KhaltiError("Khalti payment gateway timed out", 504)
+    except requests.RequestException:
+        raise KhaltiError("Khalti payment gateway is unreachable", 502)
+    try:
+        data = response.json()
+    except ValueError:
+        data = {}
+    return _initiation(response.status_code, data)
+
+
+# httpx clients are tied to the event loop that created them, so each loop
+# (normally one per ASGI worker) gets its own pool and concurrency limit.
+_async_state = weakref.WeakKeyDictionary()
+
+
+async def _close_on_shutdown(client):
+    # Parked at the yield for the loop's lifetime. loop.shutdown_asyncgens(),
+    # which asyncio.run() (and so uvicorn and async_to_sync) calls before
+    # closing the loop, resumes it and the client's connections are closed.
+    try:
+        yield
+    finally:
+        await client.aclose()
+
+
+async def _async_client():
+    loop = asyncio.get_running_loop()
+    state = _async_state.get(loop)
+    if state is None:
+        pool_size = getattr(settings, 'KHALTI_POOL_SIZE', 20)
+        client = httpx.AsyncClient(limits=httpx.Limits(
+            max_connections=pool_size, max_keepalive_connections=pool_size))
+        semaphore = asyncio.Semaphore(getattr(settings, 'KHALTI_MAX_CONCURRENCY', 50))
+        closer = _close_on_shutdown(client)
+        state = _async_state[loop] = (client, semaphore, closer)
+        await closer.asend(None)
+    return state[:2]
+
+
+async def ainitiate(payload):
+    """
+    Async initiate(): bounded by KHALTI_MAX_CONCURRENCY in-flight calls per
+    worker. Callers waiting longer than KHALTI_QUEUE_TIMEOUT for a slot are
+    turned away instead of piling up behind a slow gateway.
+    """
+    client, semaphore = await _async_client()
+    connect_timeout, read_timeout = _timeouts()
+    # The timeout cancels the acquire() in place, so a slot is either taken
+    # and released below or never taken at all
+    try:
+        async with asyncio.timeout(getattr(settings, 'KHALTI_QUEUE_TIMEOUT', 1)):
+            await semaphore.acquire()
+    except TimeoutError:
+        raise KhaltiError("Too many payments in progress, try again shortly", 503)
+
+    try:
+        response = await client.post(
+            settings.KHALTI_INITIATE_URL, json=payload, headers=_headers(),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout))
+    except httpx.TimeoutException:
+        raise KhaltiError("Khalti payment gateway timed out", 504)
+    except httpx.HTTPError:
+        raise KhaltiError("Khalti payment gateway is unreachable", 502)
+    finally:
+        semaphore.release()
+
+    try:
+        data = response.json()
+    except ValueError:
+        data = {}
+    return _initiation(response.status_code, data)
+
+
+# ---------------------- Idempotent initiation ----------------------
+
+def _intent_ttl():
+    return getattr(settings, 'PAYMENT_INTENT_TTL', 1800)
+
+
+def _cache_keys(user, payment, idempotency_key):
+    keys = {"dates": "payment-intent:{}:{}:{}:{}".format(
+        user.id, payment["venue_id"], payment["start_date"], payment["end_date"])}
+    if idempotency_key:
+        keys["key"] = f"payment-intent-key:{user.id}:{idempotency_key}"
+    return keys
+
+
+def _fingerprint(payment):
+    return (str(payment["venue_id"]), str(payment["start_date"]),
+            str(payment["end_date"]), payment["amount"])
+
+
+def find_intent(user, payment, idempotency_key=None):
+    """
+    The payment_url of a live intent for the same request, from the cache or
+    else the database, or None. An Idempotency-Key reused for a different
+    request is rejected.
+    """
+    keys = _cache_keys(user, payment, idempotency_key)
+    cached = cache.get_many(keys.values())
+    if keys.get("key") in cached:
+        fingerprint, payment_url = cached[keys["key"]]
+        if fingerprint != _fingerprint(payment):
+            raise PaymentRequestError(
+                "Idempotency-Key was already used for a different payment.", 422)
+        return payment_url
+    if keys["dates"] in cached and cached[keys["dates"]][0] == _fingerprint(payment):
+        return cached[keys["dates"]][1]
+
+    intents = PaymentIntent.objects.filter(
+        user=user, created_at__gte=timezone.now() - timedelta(seconds=_intent_ttl()))
+    intent = None
+    if idempotency_key:
+        intent = intents.filter(idempotency_key=idempotency_key).first()
+        if intent and (str(intent.venue_id), str(intent.start_date), str(intent.end_date),
+                       intent.amount) != _fingerprint(payment):
+            raise PaymentRequestError(
+                "Idempotency-Key was already used for a different payment.", 422)
+    if intent is None:
+        intent = intents.filter(
+            venue_id=payment["venue_id"], start_date=payment["start_date"],
+            end_date=payment["end_date"], amount=payment["amount"]
+        ).order_by('-created_at').first()
+    if intent is None:
+        return None
+
+    _remember(keys, payment, intent)
+    return intent.payment_url
+
+
+def _remember(keys, payment, intent):
+    remaining = _intent_ttl() - (timezone.now() - intent.created_at).total_seconds()
+    if remaining > 0:
+        entry = (_fingerprint(payment), intent.payment_url)
+        cache.set_many({key: entry for key in keys.values()}, timeout=int(remaining))
+
+
+def _check_idempotency_key(idempotency_key):
+    if idempotency_key and len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise PaymentRequestError(
+            f"Idempotency-Key must be at most {MAX_IDEMPOTENCY_KEY_LENGTH} characters.")
+
+
+def _check_available(payment):
+    if not Venue.objects.filter(pk=payment["venue_id"]).exists():
+        raise PaymentRequestError("Venue not found.", 404)
+    if Booking.objects.overlapping(
+            payment["venue_id"], payment["start_date"], payment["end_date"]).exists():
+        raise PaymentRequestError("Venue already booked for the selected dates.")
+
+
+def _acquire(user, payment, idempotency_key):
+    # Concurrent duplicates (double-clicks) must not both reach Khalti
+    lock_key = "payment-intent-lock:" + _cache_keys(user, payment, idempotency_key)["dates"]
+    connect_timeout, read_timeout = _timeouts()
+    if not cache.add(lock_key, 1, timeout=int(connect_timeout + read_timeout) + 1):
+        raise PaymentRequestError("This payment is already being initiated.", 409)
+    return lock_key
+
+
+def _new_order_id(user, payment):
+    return f"order-{user.id}-{payment['venue_id']}-{uuid.uuid4().hex[:12]}"
+
+
+def record_intent(user, payment, idempotency_key, purchase_order_id, initiation):
+    fields = dict(
+        user=user, venue_id=payment["venue_id"], start_date=payment["start_date"],
+        end_date=payment["end_date"], amount=payment["amount"],
+        purchase_order_id=purchase_order_id, idempotency_key=idempotency_key or None,
+        pidx=initiation["pidx"], payment_url=initiation["payment_url"])
+    try:
+        with transaction.atomic():
+            intent = PaymentIntent.objects.create(**fields)
+    except IntegrityError:
+        # Only a clash on the Idempotency-Key is retried: it belongs to an
+        # expired intent, and the new one wins
+        stale = PaymentIntent.objects.filter(user=user, idempotency_key=fields["idempotency_key"])
+        if fields["idempotency_key"] is None or not stale.exists():
+            raise
+        with transaction.atomic():
+            stale.delete()
+            intent = PaymentIntent.objects.create(**fields)
+    _remember(_cache_keys(user, payment, idempotency_key), payment, intent)
+    return intent
+
+
+def initiate_payment(user, payment, idempotency_key=None):
+    """
+    Return the payment_url for `payment`, reusing a live intent for the same
+    user, venue and dates (or Idempotency-Key) without calling Khalti or
+    re-checking availability.
+    """
+    _check_idempotency_key(idempotency_key)
+    payment_url = find_intent(user, payment, idempotency_key)
+    if payment_url:
+        return payment_url
+
+    lock_key = _acquire(user, payment, idempotency_key)
+    try:
+        _check_available(payment)
+        purchase_order_id = _new_order_id(user, payment)
+        initiation = initiate(build_payload(payment, user, purchase_order_id))
+        return record_intent(user, payment, idempotency_key, purchase_order_id,
+                             initiation).payment_url
+    finally:
+        cache.delete(lock_key)
+
+
+async def ainitiate_payment(user, payment, idempotency_key=None):
+    """Async initiate_payment(); only the Khalti call runs on the event loop."""
+    _check_idempotency_key(idempotency_key)
+    payment_url = await sync_to_async(find_intent)(user, payment, idempotency_key)
+    if payment_url:
+        return payment_url
+
+    lock_key = await sync_to_async(_acquire)(user, payment, idempotency_key)
+    try:
+        await sync_to_async(_check_available)(payment)
+        purchase_order_id = _new_order_id(user, payment)
+        initiation = await ainitiate(build_payload(payment, user, purchase_order_id))
+        intent = await sync_to_async(record_intent)(
+            user, payment, idempotency_key, purchase_order_id, initiation)
+        return intent.payment_url
+    finally:
+        await cache.adelete(lock_key)
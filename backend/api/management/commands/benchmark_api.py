@@ -0,0 +1,108 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (setup_databases, setup_test_environment, teardown_databases,
+                               teardown_test_environment)
+
+from api.benchmark import ENDPOINTS, compare, load_test, parse_size, run_benchmark
+
+
+class Command(BaseCommand):
+    help = ("Generate synthetic datasets of several sizes in a throwaway test database "
+            "and measure latency percentiles and queries per call for each API endpoint. "
+            "With --live-url, load-test a running server instead.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="100:200:1000,1000:2000:10000",
+                            help="Comma-separated venues:users:bookings dataset sizes.")
+        parser.add_argument("--repeat", type=int, default=20, help="Timed calls per endpoint.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--endpoints", help=f"Comma-separated subset of: {', '.join(ENDPOINTS)}.")
+        parser.add_argument("--cache", action="store_true",
+                            help="Keep the response cache (measures cache hits, not queries).")
+        parser.add_argument("--output", help="Write the results as JSON to this file.")
+        parser.add_argument("--compare", help="Results file of an earlier run to check against.")
+        parser.add_argument("--threshold", type=float, default=0.25,
+                            help="Relative p50 growth reported as a regression.")
+        parser.add_argument("--keepdb", action="store_true", help="Reuse the test database.")
+
+        live = parser.add_argument_group("live mode")
+        live.add_argument("--live-url",
+                          help="Send concurrent GETs to this URL of a running server, e.g. "
+                               "http://127.0.0.1:8000/api/venues/?page_size=20, and report "
+                               "requests per second.")
+        live.add_argument("--token", help="JWT access token to send, if the endpoint needs one.")
+        live.add_argument("--requests", type=int, default=2000)
+        live.add_argument("--concurrency", type=int, default=16)
+        live.add_argument("--warmup", type=int, default=50,
+                          help="Requests sent first and left out of the figures.")
+
+    def handle(self, *args, **options):
+        if options["live_url"]:
+            return self.handle_live(options)
+        try:
+            sizes = [parse_size(size) for size in options["sizes"].split(",")]
+        except ValueError:
+            raise CommandError("--sizes takes venues:users:bookings, e.g. 100:200:1000.")
+        if any(s["venues"] < 1 or s["users"] < 2 or s["bookings"] < 1 for s in sizes):
+            raise CommandError("Each size needs a venue, two users and a booking.")
+        endpoints = options["endpoints"].split(",") if options["endpoints"] else None
+        unknown = set(endpoints or []) - set(ENDPOINTS)
+        if unknown:
+            raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}.")
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1.")
+        baseline = None
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as f:
+                baseline = json.load(f)
+
+        # Never touch the real data: every size is generated into the test database
+        setup_test_environment(debug=False)
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=options["keepdb"])
+        try:
+            results = run_benchmark(sizes, repeat=options["repeat"], seed=options["seed"],
+                                    endpoints=endpoints, cache=options["cache"],
+                                    progress=self.report)
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=options["keepdb"])
+            teardown_test_environment()
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if baseline is not None:
+            regressions = compare(baseline, results, options["threshold"])
+            if regressions:
+                for line in regressions:
+                    self.stderr.write(line)
+                raise CommandError(f"{len(regressions)} regressions against {options['compare']}.")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['compare']}."))
+
+    def handle_live(self, options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be at least 1.")
+        summary = load_test(options["live_url"], options["requests"], options["concurrency"],
+                            options["warmup"], options["token"])
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+        for key, value in summary.items():
+            self.stdout.write(f"{key}: {value}")
+
+    def report(self, run):
+        generated = run["generated"]
+        self.stdout.write(
+            f"\n{generated['venues']} venues, {generated['users']} users, {generated['bookings']} "
+            f"bookings (generated in {generated['seconds']}s)")
+        self.stdout.write(f"  {'endpoint':<18} {'status':>6} {'queries':>7} "
+                          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for name, stats in run["endpoints"].items():
+            status = stats["status"]
+            flag = "" if status == stats["expected_status"] else f" (expected {stats['expected_status']})"
+            self.stdout.write(
+                f"  {name:<18} {status:>6} {stats['queries']:>7} {stats['p50_ms']:>9} "
+                f"{stats['p95_ms']:>9} {stats['p99_ms']:>9}{flag}")
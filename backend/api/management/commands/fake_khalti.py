@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from api.fake_khalti import FakeKhaltiServer
+
+
+class Command(BaseCommand):
+    help = "Run a local fake of Khalti's payment initiation endpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--delay", type=float, default=0.0,
+                            help="Seconds to wait before answering each call.")
+        parser.add_argument("--failure-rate", type=float, default=0.0,
+                            help="Fraction of calls answered with 503.")
+        parser.add_argument("--verbose", action="store_true")
+
+    def handle(self, *args, **options):
+        server = FakeKhaltiServer(options["host"], options["port"], options["delay"],
+                                  options["failure_rate"], options["verbose"])
+        self.stdout.write(f"Fake Khalti listening; run the API with\n"
+                          f"  KHALTI_INITIATE_URL={server.initiate_url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Served {server.request_count} requests.")
@@ -0,0 +1,51 @@
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.importer import IMPORTERS, batched, read_rows
+
+
+class Command(BaseCommand):
+    help = ("Stream venues or bookings from a CSV or JSON Lines file into the "
+            "database in batches, reporting throughput and rejected rows.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(IMPORTERS))
+        parser.add_argument("path", help="File to read, or - for stdin.")
+        parser.add_argument("--format", choices=["csv", "jsonl"],
+                            help="Defaults to the file extension, else jsonl.")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        path = options["path"]
+        fmt = options["format"] or ("csv" if path.endswith(".csv") else "jsonl")
+        import_batch = IMPORTERS[options["kind"]]
+
+        try:
+            stream = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+        except OSError as e:
+            raise CommandError(e)
+
+        saved = rejected = 0
+        started = time.perf_counter()
+        try:
+            for batch in batched(read_rows(stream, fmt), options["batch_size"]):
+                count, errors = import_batch(batch)
+                saved += count
+                rejected += len(errors)
+                for line_number, error in errors:
+                    self.stderr.write(f"line {line_number}: {json.dumps(error)}")
+                self.stdout.write(f"{saved} {options['kind']} imported, {rejected} rejected")
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        elapsed = time.perf_counter() - started
+        rate = (saved + rejected) / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {saved} {options['kind']}, rejected {rejected} rows "
+            f"in {elapsed:.2f}s ({rate:.0f} rows/s)."))
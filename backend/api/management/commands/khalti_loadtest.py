@@ -0,0 +1,70 @@
+import asyncio
+import json
+import statistics
+import time
+from collections import Counter
+
+import httpx
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = ("Fire concurrent payment initiations at a running API and report "
+            "throughput, latency and status codes.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000/api/create-khalti-payment/async/")
+        parser.add_argument("--token", required=True, help="JWT access token to send.")
+        parser.add_argument("--venue", type=int, required=True)
+        parser.add_argument("--user", type=int, required=True)
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--start-date", default="2099-01-01")
+        parser.add_argument("--end-date", default="2099-01-02")
+        parser.add_argument("--json", action="store_true", help="Print the summary as JSON.")
+
+    def handle(self, *args, **options):
+        summary = asyncio.run(self.run(options))
+        if options["json"]:
+            self.stdout.write(json.dumps(summary))
+            return
+        for key, value in summary.items():
+            self.stdout.write(f"{key}: {value}")
+
+    async def run(self, options):
+        payload = {
+            "user": options["user"],
+            "venue": options["venue"],
+            "start_date": options["start_date"],
+            "end_date": options["end_date"],
+            "amount": 10000,
+        }
+        headers = {"Authorization": f"Bearer {options['token']}"}
+        semaphore = asyncio.Semaphore(options["concurrency"])
+        latencies, statuses = [], Counter()
+
+        async with httpx.AsyncClient(timeout=60) as client:
+            async def one():
+                async with semaphore:
+                    started = time.perf_counter()
+                    try:
+                        response = await client.post(options["url"], json=payload, headers=headers)
+                        statuses[response.status_code] += 1
+                    except httpx.HTTPError as e:
+                        statuses[type(e).__name__] += 1
+                    latencies.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one() for _ in range(options["requests"])))
+            elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            "requests": options["requests"],
+            "concurrency": options["concurrency"],
+            "seconds": round(elapsed, 3),
+            "requests_per_second": round(options["requests"] / elapsed, 1),
+            "p50_ms": round(statistics.median(latencies) * 1000, 1),
+            "p95_ms": round(latencies[max(0, int(len(latencies) * 0.95) - 1)] * 1000, 1),
+            "statuses": {str(code): count for code, count in statuses.items()},
+        }
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.occupancy import rebuild_occupancy
+
+
+class Command(BaseCommand):
+    help = ("Recreate the daily occupancy rollup from the bookings, e.g. after "
+            "editing bookings outside the ORM.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--venue", type=int, action="append", dest="venues",
+                            help="Only rebuild this venue; may be repeated.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = rebuild_occupancy(options["venues"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written} daily occupancy rows in {time.perf_counter() - started:.2f}s."))
@@ -0,0 +1,48 @@
+import logging
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .querycount import record_queries
+
+logger = logging.getLogger('api.queries')
+
+
+class QueryStatsMiddleware:
+    """
+    Records the SQL each request runs and reports it in the X-DB-Queries,
+    X-DB-Time and Server-Timing response headers and on the `api.queries`
+    logger (the slowest statements at DEBUG, a WARNING once a request goes
+    over QUERY_STATS_WARN_COUNT queries or QUERY_STATS_WARN_MS).
+
+    Switched on by QUERY_STATS. Queries run while a streaming response is
+    being consumed happen after this returns and are not counted.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_STATS', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.warn_count = getattr(settings, 'QUERY_STATS_WARN_COUNT', 20)
+        self.warn_ms = getattr(settings, 'QUERY_STATS_WARN_MS', 200)
+        self.slowest = getattr(settings, 'QUERY_STATS_SLOWEST', 3)
+
+    def __call__(self, request):
+        with record_queries() as queries:
+            response = self.get_response(request)
+
+        total_ms = queries.total_ms
+        response['X-DB-Queries'] = str(queries.count)
+        response['X-DB-Time'] = f"{total_ms:.1f}ms"
+        response['Server-Timing'] = f'db;dur={total_ms:.1f};desc="{queries.count} queries"'
+
+        over_budget = queries.count > self.warn_count or total_ms > self.warn_ms
+        level = logging.WARNING if over_budget else logging.DEBUG
+        if logger.isEnabledFor(level):
+            slowest = "".join(
+                f"\n  {seconds * 1000:.2f}ms {sql}" for seconds, sql in queries.slowest(self.slowest)
+            )
+            logger.log(level, "%s %s -> %s: %d queries in %.1fms%s",
+                       request.method, request.path, response.status_code,
+                       queries.count, total_ms, slowest)
+        return response
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:36
+
+import api.models
+import django.contrib.postgres.fields.ranges
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_venue_max_capacity_venue_max_price_venue_min_price'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CanceledBooking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('venue_name', models.CharField(max_length=255, null=True)),
+                ('user_id', models.IntegerField()),
+                ('user_name', models.CharField(max_length=255, null=True)),
+                ('venue_address', models.CharField(max_length=255, null=True)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('canceled_at', models.DateTimeField(auto_now_add=True)),
+                ('reason', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-canceled_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='verified',
+            field=models.BooleanField(default=False),
+        ),
+        # Lets the GiST exclusion constraint compare the venue id with '='
+        BtreeGistExtension(),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=api.models.PostgresExclusionConstraint(expressions=[('venue', '='), (api.models.DateRange('start_date', 'end_date', django.contrib.postgres.fields.ranges.RangeBoundary(inclusive_lower=True, inclusive_upper=True)), '&&')], name='booking_no_overlapping_dates'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_venue_updated_at_booking_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentIntent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('amount', models.PositiveIntegerField()),
+                ('purchase_order_id', models.CharField(max_length=64, unique=True)),
+                ('idempotency_key', models.CharField(blank=True, max_length=255, null=True)),
+                ('pidx', models.CharField(blank=True, max_length=64, null=True)),
+                ('payment_url', models.URLField(max_length=500)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payment_intents', to=settings.AUTH_USER_MODEL)),
+                ('venue', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.venue')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'venue', 'start_date', 'end_date', 'created_at'], name='payment_intent_lookup_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'idempotency_key'), name='unique_payment_idempotency_key')],
+            },
+        ),
+    ]
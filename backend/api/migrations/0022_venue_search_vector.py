@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:40
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+CREATE_SEARCH_TRIGGER = """
+CREATE OR REPLACE FUNCTION api_venue_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.venuename, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.venueaddress, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.features, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'D');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER api_venue_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON api_venue
+    FOR EACH ROW EXECUTE FUNCTION api_venue_search_vector_update();
+
+UPDATE api_venue SET search_vector =
+    setweight(to_tsvector('english', coalesce(venuename, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(venueaddress, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(features, '')), 'C') ||
+    setweight(to_tsvector('english', coalesce(description, '')), 'D');
+
+CREATE INDEX api_venue_search_vector_gin ON api_venue USING gin (search_vector);
+"""
+
+DROP_SEARCH_TRIGGER = """
+DROP INDEX IF EXISTS api_venue_search_vector_gin;
+DROP TRIGGER IF EXISTS api_venue_search_vector_trigger ON api_venue;
+DROP FUNCTION IF EXISTS api_venue_search_vector_update();
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    # Other backends (SQLite in tests) search with a LIKE fallback instead
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_SEARCH_TRIGGER)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SEARCH_TRIGGER)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_paymentintent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venue',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
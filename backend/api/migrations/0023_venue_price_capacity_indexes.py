@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_venue_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='venue',
+            index=models.Index(fields=['min_price', 'venueid'], include=('max_capacity',), name='venue_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='venue',
+            index=models.Index(fields=['-max_capacity', 'venueid'], include=('min_price',), name='venue_capacity_idx'),
+        ),
+    ]
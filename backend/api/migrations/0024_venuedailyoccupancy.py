@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:14
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_daily_occupancy(apps, schema_editor):
+    Booking = apps.get_model('api', 'Booking')
+    VenueDailyOccupancy = apps.get_model('api', 'VenueDailyOccupancy')
+    rows = []
+    for booking in Booking.objects.order_by('id').iterator(chunk_size=2000):
+        day = booking.start_date
+        while day <= booking.end_date:
+            rows.append(VenueDailyOccupancy(venue_id=booking.venue_id, day=day,
+                                            booking_id=booking.id, verified=booking.verified))
+            day += timedelta(days=1)
+        if len(rows) >= 5000:
+            VenueDailyOccupancy.objects.bulk_create(rows, ignore_conflicts=True)
+            rows = []
+    VenueDailyOccupancy.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_venue_price_capacity_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VenueDailyOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('verified', models.BooleanField(default=False)),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupied_days', to='api.booking')),
+                ('venue', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_occupancy', to='api.venue')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('venue', 'day'), name='unique_venue_day')],
+            },
+        ),
+        migrations.RunPython(fill_daily_occupancy, migrations.RunPython.noop),
+    ]
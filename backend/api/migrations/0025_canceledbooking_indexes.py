@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_venuedailyoccupancy'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='canceledbooking',
+            index=models.Index(fields=['user_id', 'canceled_at', 'id'], name='canceled_user_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='canceledbooking',
+            index=models.Index(fields=['canceled_at', 'id'], name='canceled_time_idx'),
+        ),
+    ]
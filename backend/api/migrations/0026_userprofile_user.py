@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def link_profiles(apps, schema_editor):
+    UserProfile = apps.get_model('api', 'UserProfile')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    user_ids = dict(User.objects.values_list('username', 'id'))
+    linked = set()
+    # The oldest profile of a username wins if it was registered twice
+    for profile in UserProfile.objects.filter(user__isnull=True).order_by('id'):
+        user_id = user_ids.get(profile.username)
+        if user_id is not None and user_id not in linked:
+            UserProfile.objects.filter(pk=profile.pk).update(user_id=user_id)
+            linked.add(user_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0025_canceledbooking_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='user',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='profile', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='username',
+            field=models.TextField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(link_profiles, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,39 @@
-from django.db import models
+from django.db import models, connections
 from django.contrib.auth.models import User
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateRangeField, RangeBoundary, RangeOperators
+from django.contrib.postgres.search import SearchVectorField
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+
+class DateRange(models.Func):
+    function = 'daterange'
+    output_field = DateRangeField()
+
+
+class PostgresExclusionConstraint(ExclusionConstraint):
+    """
+    EXCLUDE constraint that is only created on PostgreSQL, so the test suite
+    can still build its tables on SQLite.
+    """
+
+    def constraint_sql(self, model, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().constraint_sql(model, schema_editor)
+
+    def create_sql(self, model, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().create_sql(model, schema_editor)
+
+    def remove_sql(self, model, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().remove_sql(model, schema_editor)
+
+    def validate(self, model, instance, exclude=None, using='default'):
+        if connections[using].vendor == 'postgresql':
+            super().validate(model, instance, exclude=exclude, using=using)
+
 class CanceledBooking(models.Model):
 
     venue_name = models.CharField(max_length=255, null=True)
@@ -17,6 +48,11 @@ class CanceledBooking(models.Model):
 
     class Meta:
         ordering = ['-canceled_at']
+        indexes = [
+            # A user's history, newest first, is a backward walk of this index
+            models.Index(fields=['user_id', 'canceled_at', 'id'], name='canceled_user_time_idx'),
+            models.Index(fields=['canceled_at', 'id'], name='canceled_time_idx'),
+        ]
 
     def __str__(self):
         return str(self.user_id)
@@ -33,20 +69,36 @@ class Note(models.Model):
 
 
 class UserProfile(models.Model): 
-    username = models.TextField(blank=True, null=True)
+    user = models.OneToOneField(User, on_delete=models.CASCADE, blank=True, null=True,
+                                related_name="profile")
+    username = models.TextField(blank=True, null=True, db_index=True)
     email = models.EmailField(max_length=254, blank=True, null=True)
     address = models.TextField(blank=True, null=True)
     phoneNumber = models.BigIntegerField(blank=True, null=True)
     is_venue_owner = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def save(self, *args, **kwargs):
+        # Profiles are registered after their account, under the same username.
+        # Like migration 0026, only the first profile of a user gets linked.
+        if self.user_id is None and self.username:
+            self.user = User.objects.filter(username=self.username, profile__isnull=True).first()
+        super().save(*args, **kwargs)
 
     def __str__(self):
-        return self.user.username
+        return self.user.username if self.user_id else str(self.username)
 
 
 from django.db import models
 
 from django.contrib.auth.models import User  # Import User model
 
+class VenueManager(models.Manager):
+    def get_queryset(self):
+        # search_vector is only read by the database; don't ship it around
+        return super().get_queryset().defer('search_vector')
+
+
 class Venue(models.Model):
     venueid = models.AutoField(primary_key=True)
     venuename = models.CharField(max_length=255)
@@ -60,26 +112,134 @@ class Venue(models.Model):
     min_price = models.DecimalField(max_digits=10, decimal_places=2, default=100)  # New field for minimum price
     max_price = models.DecimalField(max_digits=10, decimal_places=2, default=500)  # New field for maximum price
     max_capacity = models.IntegerField(default=100)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # Weighted tsvector of name, address, features and description. Filled
+    # in by a PostgreSQL trigger and GIN-indexed (see migration 0022).
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = VenueManager()
 
     class Meta:
         db_table = 'api_venue'
         managed = True
+        indexes = [
+            # Back the ?ordering=price|-capacity listings; the included
+            # column lets the other range filter be checked in the index.
+            models.Index(fields=['min_price', 'venueid'], include=['max_capacity'],
+                         name='venue_price_idx'),
+            models.Index(fields=['-max_capacity', 'venueid'], include=['min_price'],
+                         name='venue_capacity_idx'),
+        ]
 
     def __str__(self):
         return self.venuename
 
 
     
+# Both ends of a booking are inclusive: a booking from the 1st to the 3rd
+# occupies the 3rd as well.
+INCLUSIVE_BOUNDS = RangeBoundary(inclusive_lower=True, inclusive_upper=True)
+BOOKING_OVERLAP_CONSTRAINT = 'booking_no_overlapping_dates'
+
+
+class BookingQuerySet(models.QuerySet):
+    def overlapping(self, venue, start_date, end_date):
+        """
+        Bookings of `venue` that share at least one day with
+        [start_date, end_date]. On PostgreSQL this is a range-overlap
+        lookup served by the exclusion constraint's GiST index.
+        """
+        if connections[self.db].vendor == 'postgresql':
+            requested = DateRange(
+                models.Value(start_date, output_field=models.DateField()),
+                models.Value(end_date, output_field=models.DateField()),
+                INCLUSIVE_BOUNDS)
+            return self.alias(
+                period=DateRange('start_date', 'end_date', INCLUSIVE_BOUNDS)
+            ).filter(venue=venue, period__overlap=requested)
+
+        return self.filter(
+            venue=venue,
+            start_date__lte=end_date,
+            end_date__gte=start_date
+        )
+
+
 class Booking(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, default=1)
     venue = models.ForeignKey("Venue", on_delete=models.CASCADE)
     start_date = models.DateField()
     end_date = models.DateField()
     verified = models.BooleanField(default=False)  # New field
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = BookingQuerySet.as_manager()
 
     class Meta:
         unique_together = ("venue", "start_date", "end_date")
+        constraints = [
+            # Two bookings of the same venue may never share a day. Enforced
+            # by PostgreSQL so concurrent inserts cannot both succeed.
+            PostgresExclusionConstraint(
+                name=BOOKING_OVERLAP_CONSTRAINT,
+                expressions=[
+                    ('venue', RangeOperators.EQUAL),
+                    (DateRange('start_date', 'end_date', INCLUSIVE_BOUNDS),
+                     RangeOperators.OVERLAPS),
+                ],
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} booked {self.venue.venuename} from {self.start_date} to {self.end_date}"
 
+
+class VenueDailyOccupancy(models.Model):
+    """
+    One row per venue per booked day, kept in step with Booking by
+    api.signals (see api.occupancy). Lets reports count and group days
+    without expanding every booking's date range.
+    """
+    venue = models.ForeignKey("Venue", on_delete=models.CASCADE, related_name="daily_occupancy")
+    day = models.DateField()
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name="occupied_days")
+    verified = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            # Bookings never overlap, so a day belongs to at most one of them
+            models.UniqueConstraint(fields=["venue", "day"], name="unique_venue_day"),
+        ]
+
+    def __str__(self):
+        return f"{self.venue_id} {self.day}"
+
+
+class PaymentIntent(models.Model):
+    """
+    A Khalti payment initiated for a booking request. Lets retries and
+    double-clicks reuse the same payment_url instead of calling Khalti again.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="payment_intents")
+    venue = models.ForeignKey("Venue", on_delete=models.CASCADE)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    amount = models.PositiveIntegerField()  # in paisa
+    purchase_order_id = models.CharField(max_length=64, unique=True)
+    idempotency_key = models.CharField(max_length=255, blank=True, null=True)
+    pidx = models.CharField(max_length=64, blank=True, null=True)
+    payment_url = models.URLField(max_length=500)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "venue", "start_date", "end_date", "created_at"],
+                         name="payment_intent_lookup_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["user", "idempotency_key"],
+                                    name="unique_payment_idempotency_key"),
+        ]
+
+    def __str__(self):
+        return self.purchase_order_id
@@ -0,0 +1,111 @@
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .models import Booking, VenueDailyOccupancy
+
+# Rows written per INSERT when (re)building the daily occupancy table
+OCCUPANCY_BATCH_SIZE = 5000
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def add_months(day, months):
+    """First day of the month `months` after the month containing `day`."""
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def occupied_ranges(venue_id, start_date, end_date):
+    """
+    Days of `venue_id` taken by bookings between start_date and end_date
+    (inclusive), as a sorted list of merged, non-overlapping
+    (first_day, last_day) runs clipped to the window.
+    """
+    bookings = (Booking.objects.overlapping(venue_id, start_date, end_date)
+                .order_by('start_date')
+                .values_list('start_date', 'end_date'))
+
+    ranges = []
+    for first, last in bookings:
+        first, last = max(first, start_date), min(last, end_date)
+        if ranges and first <= ranges[-1][1] + timedelta(days=1):
+            ranges[-1] = (ranges[-1][0], max(ranges[-1][1], last))
+        else:
+            ranges.append((first, last))
+    return ranges
+
+
+def month_bitmaps(ranges, start_date, months):
+    """
+    One integer per month starting at start_date's month, with bit (day - 1)
+    set for every occupied day, keyed by "YYYY-MM".
+    """
+    bitmaps = {}
+    for offset in range(months):
+        first = add_months(start_date, offset)
+        bitmaps[first.strftime("%Y-%m")] = 0
+
+    for first, last in ranges:
+        day = first
+        while day <= last:
+            bitmaps[day.strftime("%Y-%m")] |= 1 << (day.day - 1)
+            day += timedelta(days=1)
+    return bitmaps
+
+
+def occupancy_rows(booking):
+    day = booking.start_date
+    while day <= booking.end_date:
+        yield VenueDailyOccupancy(venue_id=booking.venue_id, day=day,
+                                  booking_id=booking.pk, verified=booking.verified)
+        day += timedelta(days=1)
+
+
+def record_occupancy(bookings):
+    """
+    Add the daily occupancy rows of newly saved `bookings`, in batches.
+    Returns the number of rows written.
+    """
+    rows, written = [], 0
+    for booking in bookings:
+        rows.extend(occupancy_rows(booking))
+        if len(rows) >= OCCUPANCY_BATCH_SIZE:
+            VenueDailyOccupancy.objects.bulk_create(rows, ignore_conflicts=True)
+            written += len(rows)
+            rows = []
+    if rows:
+        VenueDailyOccupancy.objects.bulk_create(rows, ignore_conflicts=True)
+    return written + len(rows)
+
+
+def refresh_occupancy(booking):
+    """Bring the rows of an edited booking in line with its dates and status."""
+    rows = VenueDailyOccupancy.objects.filter(booking=booking)
+    span = (booking.end_date - booking.start_date).days + 1
+    counts = rows.aggregate(total=Count('id'), in_place=Count('id', filter=Q(
+        venue_id=booking.venue_id, day__gte=booking.start_date, day__lte=booking.end_date)))
+    if counts['total'] == counts['in_place'] == span:
+        # Same venue and dates, so at most the verified flag changed
+        rows.exclude(verified=booking.verified).update(verified=booking.verified)
+        return
+    rows.delete()
+    record_occupancy([booking])
+
+
+def rebuild_occupancy(venue_ids=None):
+    """
+    Recreate the daily occupancy rows from the bookings, for every venue or
+    only `venue_ids`. Returns the number of rows written.
+    """
+    bookings = Booking.objects.order_by('id')
+    rows = VenueDailyOccupancy.objects.all()
+    if venue_ids:
+        bookings = bookings.filter(venue_id__in=venue_ids)
+        rows = rows.filter(venue_id__in=venue_ids)
+    with transaction.atomic():
+        rows.delete()
+        return record_occupancy(bookings.iterator(chunk_size=2000))
@@ -0,0 +1,47 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+from .filters import venue_ordering
+
+
+class OptInCursorPagination(CursorPagination):
+    """
+    Keyset pagination that only kicks in when the client asks for it with
+    `?cursor=` or `?page_size=`, so existing callers keep getting plain lists.
+
+    Pages are fetched with `WHERE key > last_key ORDER BY key LIMIT n`, which
+    costs the same on page 1000 as on page 1.
+    """
+    page_size = getattr(settings, 'API_PAGE_SIZE', 50)
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 500)
+
+    def get_page_size(self, request):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return super().get_page_size(request)
+
+
+class VenueCursorPagination(OptInCursorPagination):
+    ordering = 'venueid'
+
+    def get_ordering(self, request, queryset, view):
+        # Follow ?ordering= so cursors walk the same index as the query
+        return venue_ordering(request.query_params)
+
+
+class BookingCursorPagination(OptInCursorPagination):
+    ordering = 'id'
+
+
+class CanceledBookingCursorPagination(OptInCursorPagination):
+    # Newest first; id breaks ties between cancellations in the same instant
+    ordering = ('-canceled_at', '-id')
+
+
+class SearchPagination(PageNumberPagination):
+    """Ranked results are not keyset-friendly; search pages are short anyway."""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -0,0 +1,45 @@
+import time
+from contextlib import contextmanager
+
+from django.db import connections
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper that counts and times every statement run on a
+    connection. Unlike connection.queries it works with DEBUG off.
+    """
+
+    def __init__(self):
+        self.statements = []  # (seconds, sql) in execution order
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.statements.append((time.perf_counter() - started, sql))
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    @property
+    def total_ms(self):
+        return sum(seconds for seconds, _ in self.statements) * 1000
+
+    def slowest(self, n=5):
+        return sorted(self.statements, key=lambda s: s[0], reverse=True)[:n]
+
+    def report(self):
+        return "\n".join(
+            f"  {i}. {seconds * 1000:.2f}ms {sql}"
+            for i, (seconds, sql) in enumerate(self.statements, 1)
+        )
+
+
+@contextmanager
+def record_queries(using='default'):
+    recorder = QueryRecorder()
+    with connections[using].execute_wrapper(recorder):
+        yield recorder
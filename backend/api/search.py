@@ -0,0 +1,38 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import Case, F, IntegerField, Q, Value, When
+
+from .models import Venue
+
+SEARCH_CONFIG = 'english'
+SEARCH_FIELDS = ['venuename', 'venueaddress', 'features', 'description']
+
+
+def search_venues(text):
+    """
+    Venues matching `text`, best match first, with a `rank` annotation.
+
+    PostgreSQL matches against the GIN-indexed search_vector column using
+    web-search syntax ("quoted phrases", -exclusions, OR). Other backends
+    fall back to requiring every word somewhere in the searchable fields.
+    """
+    venues = Venue.objects.all()
+    if connections[venues.db].vendor == 'postgresql':
+        query = SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+        return (venues.filter(search_vector=query)
+                .annotate(rank=SearchRank(F('search_vector'), query))
+                .order_by('-rank', 'venueid'))
+
+    condition = Q()
+    for word in text.split():
+        word_matches = Q()
+        for field in SEARCH_FIELDS:
+            word_matches |= Q(**{f'{field}__icontains': word})
+        condition &= word_matches
+
+    # Same field weights as the tsvector: name, address, features, description
+    rank = Case(
+        *[When(**{f'{field}__icontains': text}, then=Value(len(SEARCH_FIELDS) - i))
+          for i, field in enumerate(SEARCH_FIELDS)],
+        default=Value(0), output_field=IntegerField())
+    return venues.filter(condition).annotate(rank=rank).order_by('-rank', 'venueid')
@@ -2,8 +2,144 @@ from .models import Booking, UserProfile
 from .models import Venue
 from django.contrib.auth.models import User
 from rest_framework import serializers
+from django.db import models, transaction, IntegrityError
+from rest_framework.settings import api_settings
 from .models import Note, UserProfile, Venue, Booking, CanceledBooking
 
+
+BOOKING_CONFLICT_MESSAGE = "This venue is already booked for the selected dates."
+UNKNOWN_USER_INFO = {"username": "Unknown", "email": "N/A", "phoneNumber": "N/A"}
+
+
+def user_info_for(user_profile):
+    if user_profile is None:
+        return dict(UNKNOWN_USER_INFO)
+    return {
+        "username": user_profile.username,
+        "email": user_profile.email,
+        "phoneNumber": user_profile.phoneNumber,
+    }
+
+
+def profiles_for(request, user_ids):
+    """
+    {user_id: UserProfile or None} for `user_ids`. Profiles are remembered
+    on the request, so each one is fetched at most once per request however
+    many serializers ask for it; without a request the lookup is one-off.
+    """
+    if request is not None:
+        # Keep the map on the HttpRequest shared by every DRF Request wrapper
+        request = getattr(request, '_request', request)
+        profiles = request.__dict__.setdefault('_user_profiles', {})
+    else:
+        profiles = {}
+
+    missing = set(user_ids) - profiles.keys()
+    if missing:
+        profiles.update(dict.fromkeys(missing))
+        for profile in UserProfile.objects.filter(user_id__in=missing):
+            profiles[profile.user_id] = profile
+    return {user_id: profiles[user_id] for user_id in user_ids}
+
+
+def load_booked_dates(venues, request=None):
+    """
+    Fetch the bookings of every venue in `venues` and their booker profiles
+    in at most two queries, returning {venueid: [(booking, user_profile), ...]}.
+    """
+    venue_ids = [venue.pk for venue in venues]
+    booked = {venue_id: [] for venue_id in venue_ids}
+    if not venue_ids:
+        return booked
+
+    bookings = list(Booking.objects.filter(
+        venue_id__in=venue_ids).order_by('id'))
+    profiles = profiles_for(request, {booking.user_id for booking in bookings})
+
+    for booking in bookings:
+        booked[booking.venue_id].append(
+            (booking, profiles.get(booking.user_id)))
+    return booked
+
+
+def booked_dates_for(serializer, venue, include_id):
+    booked = getattr(serializer, 'booked_dates_map', None)
+    if booked is None or venue.pk not in booked:
+        booked = load_booked_dates([venue], serializer.context.get('request'))
+
+    booked_data = []
+    for booking, user_profile in booked[venue.pk]:
+        entry = {"id": booking.id} if include_id else {}
+        entry.update({
+            "start_date": booking.start_date,
+            "end_date": booking.end_date,
+            "user": user_info_for(user_profile)
+        })
+        booked_data.append(entry)
+    return booked_data
+
+
+def split_param(request, name):
+    value = request.query_params.get(name, '') if request is not None else ''
+    return {part.strip() for part in value.split(',') if part.strip()}
+
+
+class SparseFieldsMixin:
+    """
+    Lets GET requests pick fields with ?fields=a,b. Fields named in
+    Meta.expandable_fields are costly and, once ?fields= is given, are only
+    included when also listed in ?expand=. Without ?fields= the full
+    representation is returned as before.
+
+    Meta.field_columns maps computed fields to the model columns they are
+    built from, so restrict_queryset() does not defer those.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+
+        requested = split_param(request, 'fields')
+        if not requested:
+            return
+        keep = requested | (split_param(request, 'expand') &
+                            set(getattr(self.Meta, 'expandable_fields', ())))
+        for name in set(self.fields) - keep:
+            self.fields.pop(name)
+
+    @classmethod
+    def restrict_queryset(cls, queryset, request):
+        """Only load the model columns the requested fields are built from."""
+        requested = split_param(request, 'fields')
+        if not requested or request.method != 'GET':
+            return queryset
+        model = cls.Meta.model
+        columns = {field.name for field in model._meta.concrete_fields} & requested
+        field_columns = getattr(cls.Meta, 'field_columns', {})
+        for name in requested:
+            columns.update(field_columns.get(name, ()))
+        # Relations joined with select_related() cannot be deferred
+        if isinstance(queryset.query.select_related, dict):
+            columns |= set(queryset.query.select_related)
+        return queryset.only(model._meta.pk.name, *columns)
+
+
+class BookedDatesListSerializer(serializers.ListSerializer):
+    """
+    Loads booked_dates for the whole page of venues up front so that
+    serializing N venues costs a fixed number of queries.
+    """
+
+    def to_representation(self, data):
+        venues = data.all() if isinstance(data, models.manager.BaseManager) else data
+        venues = list(venues)
+        if 'booked_dates' in self.child.fields:
+            self.child.booked_dates_map = load_booked_dates(
+                venues, self.context.get('request'))
+        return super().to_representation(venues)
+
 class CanceledBookingSerializer(serializers.ModelSerializer):
     class Meta:
         model = CanceledBooking
@@ -62,79 +198,80 @@ class UserSerializers(serializers.ModelSerializer):
                   'address', 'phoneNumber', 'is_venue_owner']
 
 
-class VenueSerializer(serializers.ModelSerializer):
+class VenueSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     booked_dates = serializers.SerializerMethodField()
 
     class Meta:
         model = Venue
+        list_serializer_class = BookedDatesListSerializer
+        expandable_fields = ['booked_dates']
         fields = ['venueid', 'venuename', 'venueaddress', 'review', 'features',
                   'status', 'description', 'imageurl', 'venueownerid', 'min_price', 'max_price', 'max_capacity', 'booked_dates']
 
     def get_booked_dates(self, obj):
-        bookings = Booking.objects.filter(venue=obj).select_related('user')
-
-        booked_data = []
-        for booking in bookings:
-            try:
-                user_profile = UserProfile.objects.get(id=booking.user.id)
-                user_info = {
-                    "username": user_profile.username,
-                    "email": user_profile.email,
-                    "phoneNumber": user_profile.phoneNumber,
-                }
-            except UserProfile.DoesNotExist:
-                user_info = {"username": "Unknown",
-                             "email": "N/A", "phoneNumber": "N/A"}
-
-            booked_data.append({
-                "id": booking.id,
-                "start_date": booking.start_date,
-                "end_date": booking.end_date,
-                "user": user_info
-            })
-
-        return booked_data
-
-
-class BookingSerializer(serializers.ModelSerializer):
+        return booked_dates_for(self, obj, include_id=True)
+
+
+class BookingListSerializer(serializers.ListSerializer):
+    """
+    Loads the booker profiles for the whole list in one query. Pair it with
+    select_related('venue') on the queryset for venue_name/venue_address.
+    """
+
+    def to_representation(self, data):
+        bookings = data.all() if isinstance(data, models.manager.BaseManager) else data
+        bookings = list(bookings)
+        if 'user_info' in self.child.fields:
+            self.child.user_profiles = profiles_for(
+                self.context.get('request'), {booking.user_id for booking in bookings})
+        return super().to_representation(bookings)
+
+
+class BookingSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user_info = serializers.SerializerMethodField()
     venue_name = serializers.CharField(source='venue.venuename', read_only=True)
     venue_address = serializers.CharField(source='venue.venueaddress', read_only=True)
 
     class Meta:
         model = Booking
+        list_serializer_class = BookingListSerializer
         fields = ["id", "venue", "start_date",
                   "end_date", "user", "user_info", "verified",'venue_name', 'venue_address']
+        field_columns = {'user_info': ['user'], 'venue_name': ['venue'], 'venue_address': ['venue']}
 
     def get_user_info(self, obj):
-        try:
-            user_profile = UserProfile.objects.get(id=obj.user.id)
-            return {
-                "username": user_profile.username,
-                "email": user_profile.email,
-                "phoneNumber": user_profile.phoneNumber,
-            }
-        except UserProfile.DoesNotExist:
-            return {"username": "Unknown", "email": "N/A", "phoneNumber": "N/A"}
+        user_profiles = getattr(self, 'user_profiles', None)
+        if user_profiles is None or obj.user_id not in user_profiles:
+            user_profiles = profiles_for(self.context.get('request'), [obj.user_id])
+        return user_info_for(user_profiles[obj.user_id])
 
     def validate(self, data):
         venue = data["venue"]
         start_date = data["start_date"]
         end_date = data["end_date"]
 
+        if start_date > end_date:
+            raise serializers.ValidationError("End date must be after start date")
+
         # Check for conflicting bookings
-        existing_booking = Booking.objects.filter(
-            venue=venue,
-            start_date__lte=end_date,
-            end_date__gte=start_date
-        ).exists()
+        existing_booking = Booking.objects.overlapping(
+            venue, start_date, end_date).exists()
 
         if existing_booking:
-            raise serializers.ValidationError(
-                "This venue is already booked for the selected dates.")
+            raise serializers.ValidationError(BOOKING_CONFLICT_MESSAGE)
 
         return data
 
+    def create(self, validated_data):
+        # validate() can race with a concurrent booking; the exclusion
+        # constraint has the final word and is reported the same way.
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [BOOKING_CONFLICT_MESSAGE]})
+
 
 class BookingStatusSerializer(serializers.ModelSerializer):
     class Meta:
@@ -147,40 +284,76 @@ class BookingStatusSerializer(serializers.ModelSerializer):
         return data
 
 
+class BulkVerifySerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1),
+                                allow_empty=False, max_length=1000)
+    verified = serializers.BooleanField(default=True)
+
+    def validate_ids(self, ids):
+        # Keep the caller's order for the results, without duplicates
+        return list(dict.fromkeys(ids))
+
+
+class CancelReasonSerializer(serializers.Serializer):
+    reason = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+
+class CancelBookingsSerializer(CancelReasonSerializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1),
+                                allow_empty=False, max_length=1000)
+
+    def validate_ids(self, ids):
+        return list(dict.fromkeys(ids))
+
+
+class VenueSummarySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Venue fields without booked_dates, for search-style listings."""
+
+    class Meta:
+        model = Venue
+        fields = ['venueid', 'venuename', 'venueaddress', 'review', 'features',
+                  'status', 'description', 'imageurl', 'venueownerid', 'min_price', 'max_price', 'max_capacity']
+
+
 class VenueRegisterSerializer(serializers.ModelSerializer):
     class Meta:
         model = Venue
-        exclude = ['review', 'status']
+        exclude = ['review', 'status', 'updated_at', 'search_vector']
+
 
+class VenueImportSerializer(VenueRegisterSerializer):
+    # The owners of a whole import batch are looked up together
+    venueownerid = serializers.IntegerField(min_value=1)
 
-class VenueListSerializer(serializers.ModelSerializer):
+
+class BookingImportSerializer(BookingSerializer):
+    """
+    BookingSerializer's rules for one imported row. Venues, users and date
+    conflicts are checked per batch by api.importer instead of per row.
+    """
+    venue = serializers.IntegerField(min_value=1)
+    user = serializers.IntegerField(min_value=1)
+
+    class Meta(BookingSerializer.Meta):
+        fields = ["venue", "user", "start_date", "end_date", "verified"]
+        validators = []
+
+    def validate(self, data):
+        if data["start_date"] > data["end_date"]:
+            raise serializers.ValidationError("End date must be after start date")
+        return data
+
+
+class VenueListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     booked_dates = serializers.SerializerMethodField()
 
     class Meta:
         model = Venue
+        list_serializer_class = BookedDatesListSerializer
+        expandable_fields = ['booked_dates']
         fields = ['venueid', 'venuename', 'venueaddress', 'review', 'features',
                   'status', 'description', 'imageurl', 'venueownerid', 'min_price', 'max_price', 'max_capacity', 'booked_dates']
 
     def get_booked_dates(self, obj):
-        bookings = Booking.objects.filter(venue=obj).select_related('user')
-
-        booked_data = []
-        for booking in bookings:
-            try:
-                user_profile = UserProfile.objects.get(id=booking.user.id)
-                user_info = {
-                    "username": user_profile.username,
-                    "email": user_profile.email,
-                    "phoneNumber": user_profile.phoneNumber,
-                }
-            except UserProfile.DoesNotExist:
-                user_info = {"username": "Unknown",
-                             "email": "N/A", "phoneNumber": "N/A"}
-
-            booked_data.append({
-                "start_date": booking.start_date,
-                "end_date": booking.end_date,
-                "user": user_info
-            })
-
-        return booked_data
+        return booked_dates_for(self, obj, include_id=False)
+
@@ -0,0 +1,42 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .caching import bump_version, invalidate_venue
+from .models import Booking, Venue
+from .occupancy import record_occupancy, refresh_occupancy
+
+
+@receiver(pre_save, sender=Venue)
+def remember_venue_owner(sender, instance, **kwargs):
+    # An owner change must also refresh the previous owner's venue list
+    instance._previous_owner_id = None
+    if instance.pk is not None:
+        instance._previous_owner_id = Venue.objects.filter(
+            pk=instance.pk).values_list('venueownerid', flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=Venue)
+def invalidate_venue_responses(sender, instance, **kwargs):
+    invalidate_venue(instance.pk, instance.venueownerid_id,
+                     getattr(instance, '_previous_owner_id', None))
+
+
+@receiver([post_save, post_delete], sender=Booking)
+def invalidate_booking_responses(sender, instance, **kwargs):
+    bump_version('venue-calendar', instance.venue_id)
+    # booked_dates is part of the serialized venue
+    if Booking.venue.is_cached(instance):
+        owner_id = instance.venue.venueownerid_id
+    else:
+        owner_id = Venue.objects.filter(
+            pk=instance.venue_id).values_list('venueownerid', flat=True).first()
+    invalidate_venue(instance.venue_id, owner_id)
+
+
+@receiver(post_save, sender=Booking)
+def update_daily_occupancy(sender, instance, created, **kwargs):
+    # Deleted bookings take their rows with them (on_delete=CASCADE)
+    if created:
+        record_occupancy([instance])
+    else:
+        refresh_occupancy(instance)
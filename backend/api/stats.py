@@ -0,0 +1,50 @@
+from django.db import models
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Venue, VenueDailyOccupancy
+
+
+def owner_stats(owner_id, start_date, end_date):
+    """
+    Per-venue figures for the owner's venues between start_date and end_date
+    (inclusive), in one query. Booked nights are counted from the daily
+    occupancy rollup, so only days inside the window count. Revenue is
+    estimated from the venue's price range.
+    """
+    window_days = (end_date - start_date).days + 1
+    in_window = Q(booking__start_date__lte=end_date, booking__end_date__gte=start_date)
+    booked_days = VenueDailyOccupancy.objects.filter(
+        venue=OuterRef('pk'), day__gte=start_date, day__lte=end_date,
+    ).order_by().values('venue').annotate(days=Count('*')).values('days')
+    money = models.DecimalField(max_digits=14, decimal_places=2)
+
+    venues = Venue.objects.filter(venueownerid=owner_id).annotate(
+        bookings=Count('booking', filter=in_window),
+        verified_bookings=Count('booking', filter=in_window & Q(booking__verified=True)),
+        booked_nights=Coalesce(Subquery(booked_days), 0),
+    ).annotate(
+        revenue_min=models.ExpressionWrapper(F('booked_nights') * F('min_price'), output_field=money),
+        revenue_max=models.ExpressionWrapper(F('booked_nights') * F('max_price'), output_field=money),
+    ).order_by('venueid').values(
+        'venueid', 'venuename', 'bookings', 'verified_bookings', 'booked_nights',
+        'revenue_min', 'revenue_max')
+
+    rows = []
+    for venue in venues:
+        venue['unverified_bookings'] = venue['bookings'] - venue['verified_bookings']
+        venue['occupancy_rate'] = round(venue['booked_nights'] / window_days, 4)
+        rows.append(venue)
+
+    totals = {key: sum(venue[key] for venue in rows) for key in (
+        'bookings', 'verified_bookings', 'unverified_bookings', 'booked_nights',
+        'revenue_min', 'revenue_max')}
+    totals['occupancy_rate'] = (
+        round(totals['booked_nights'] / (window_days * len(rows)), 4) if rows else 0)
+    return {
+        'from': start_date,
+        'to': end_date,
+        'days': window_days,
+        'venues': rows,
+        'totals': totals,
+    }
@@ -0,0 +1,141 @@
+import random
+from bisect import bisect
+from datetime import date, timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .caching import bump_version, invalidate_venue
+from .models import Booking, CanceledBooking, UserProfile, Venue
+from .occupancy import record_occupancy
+
+BATCH_SIZE = 2000
+
+CITIES = [("Kathmandu", 40), ("Lalitpur", 15), ("Bhaktapur", 10), ("Pokhara", 15),
+          ("Chitwan", 8), ("Biratnagar", 6), ("Butwal", 6)]
+NAME_WORDS = ["Royal", "Garden", "Himalayan", "Party", "Palace", "Heritage", "Lakeside",
+              "Grand", "Banquet", "Sunrise", "Temple View", "Everest"]
+NAME_KINDS = ["Hall", "Palace", "Resort", "Banquet", "Pavilion", "Courtyard"]
+FEATURES = ["Parking", "WiFi", "Catering", "Stage", "Sound system", "Garden",
+            "Air conditioning", "Decoration", "Bridal room", "Generator backup"]
+CAPACITIES = [50, 100, 150, 200, 300, 500, 800, 1000]
+
+# Bookings per month: the wedding seasons (Mangsir/Magh, Baishakh) peak
+MONTH_WEIGHTS = [1.4, 1.3, 0.9, 1.0, 1.3, 0.8, 0.5, 0.5, 0.7, 0.9, 1.3, 1.6]
+# Mon..Sun; Saturday is the Nepali weekend, Friday evenings are popular too
+WEEKDAY_WEIGHTS = [0.7, 0.7, 0.7, 0.8, 1.3, 2.0, 0.9]
+# Extra days after the first: mostly single-day events
+EXTRA_DAYS = [0, 1, 2, 3, 6]
+EXTRA_DAY_WEIGHTS = [55, 25, 10, 7, 3]
+
+
+def _booking_period(rng, anchor):
+    """Draw a (start, end) around `anchor`: some history, mostly upcoming."""
+    while True:
+        if rng.random() < 0.25:
+            offset = -rng.randint(1, 180)
+        else:
+            # Lead time: most events are booked a few weeks to months ahead
+            offset = min(int(rng.expovariate(1 / 45)), 365)
+        start = anchor + timedelta(days=offset)
+        weight = MONTH_WEIGHTS[start.month - 1] * WEEKDAY_WEIGHTS[start.weekday()]
+        if rng.random() * 3.2 < weight:
+            extra = rng.choices(EXTRA_DAYS, EXTRA_DAY_WEIGHTS)[0]
+            return start, start + timedelta(days=extra)
+
+
+def generate(venues, users, bookings, seed=0, anchor=None, prefix="synth", canceled=0.05):
+    """
+    Fill the database with `users` users (one in five owns venues),
+    `venues` venues and up to `bookings` non-overlapping bookings spread
+    around `anchor` (default today), plus a share of canceled bookings.
+
+    The same arguments always produce the same rows. Usernames start with
+    `prefix`, so generating twice with one prefix fails on the unique
+    username. Returns the number of rows created per model.
+    """
+    if users < 2 or venues < 1:
+        raise ValueError("Need at least two users and one venue.")
+    rng = random.Random(seed)
+    anchor = anchor or date.today()
+    password = make_password("synthetic")
+
+    with transaction.atomic():
+        user_objs = User.objects.bulk_create(
+            [User(username=f"{prefix}-{i:07d}", email=f"{prefix}-{i}@example.com", password=password)
+             for i in range(users)], batch_size=BATCH_SIZE)
+        owners = user_objs[:max(1, users // 5)]
+        owner_ids = {owner.id for owner in owners}
+        UserProfile.objects.bulk_create(
+            [UserProfile(user=u, username=u.username, email=u.email,
+                         address=rng.choices(*zip(*CITIES))[0],
+                         phoneNumber=9800000000 + rng.randint(0, 9999999),
+                         is_venue_owner=u.id in owner_ids)
+             for u in user_objs], batch_size=BATCH_SIZE)
+
+        venue_objs = []
+        for i in range(venues):
+            city = rng.choices(*zip(*CITIES))[0]
+            min_price = rng.randint(5, 120) * 1000
+            venue_objs.append(Venue(
+                venuename=f"{rng.choice(NAME_WORDS)} {rng.choice(NAME_KINDS)} {i}",
+                venueaddress=f"Ward {rng.randint(1, 32)}, {city}",
+                review=rng.choice(["Lovely venue", "Good food, friendly staff", "Spacious and clean"]),
+                features=", ".join(rng.sample(FEATURES, rng.randint(2, 6))),
+                status=rng.random() < 0.95,
+                description=f"Event venue in {city} for weddings, receptions and parties.",
+                imageurl=[f"venues/{i}/{n}.jpg" for n in range(rng.randint(1, 4))],
+                venueownerid=rng.choice(owners),
+                min_price=min_price,
+                max_price=int(min_price * rng.uniform(1.5, 4)),
+                max_capacity=rng.choice(CAPACITIES),
+            ))
+        venue_objs = Venue.objects.bulk_create(venue_objs, batch_size=BATCH_SIZE)
+
+        # A few popular venues take most of the bookings
+        cum_weights = list(accumulate(rng.paretovariate(1.2) for _ in venue_objs))
+        guests = user_objs[len(owners):]
+        taken = {}
+        booking_objs = []
+        for _ in range(bookings):
+            for _attempt in range(20):
+                venue = venue_objs[bisect(cum_weights, rng.random() * cum_weights[-1])]
+                start, end = _booking_period(rng, anchor)
+                days = {start + timedelta(days=n) for n in range((end - start).days + 1)}
+                booked = taken.setdefault(venue.venueid, set())
+                if not booked & days:
+                    break
+            else:
+                continue  # Too crowded; the count comes back short
+            booked |= days
+            booking_objs.append(Booking(
+                venue=venue, user=rng.choice(guests), start_date=start, end_date=end,
+                verified=rng.random() < (0.9 if end < anchor else 0.6)))
+        Booking.objects.bulk_create(booking_objs, batch_size=BATCH_SIZE)
+        record_occupancy(booking_objs)
+
+        canceled_objs = []
+        for _ in range(int(len(booking_objs) * canceled)):
+            venue = rng.choice(venue_objs)
+            guest = rng.choice(guests)
+            start, end = _booking_period(rng, anchor)
+            canceled_objs.append(CanceledBooking(
+                venue_name=venue.venuename, venue_address=venue.venueaddress,
+                user_id=guest.id, user_name=guest.username, start_date=start, end_date=end,
+                reason=rng.choice(["Change of plans", "Found another venue", None])))
+        CanceledBooking.objects.bulk_create(canceled_objs, batch_size=BATCH_SIZE)
+
+    # bulk_create() sends no signals, so drop what the caches hold here
+    bump_version('venue-list', 'all')
+    for venue in venue_objs:
+        bump_version('venue-calendar', venue.venueid)
+        invalidate_venue(venue.venueid, venue.venueownerid_id)
+
+    return {
+        "users": len(user_objs),
+        "venues": len(venue_objs),
+        "bookings": len(booking_objs),
+        "canceled": len(canceled_objs),
+    }
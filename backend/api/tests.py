@@ -1,13 +1,28 @@
 import pytest
+import asyncio
 import json
+from contextlib import contextmanager
+from io import StringIO
 from django.urls import reverse
-from rest_framework.test import APIClient
+from django.core.management import call_command
+from django.core.cache import cache
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.request import Request
 from rest_framework import status
 from django.contrib.auth.models import User
+from django.db import connection, transaction, IntegrityError
+from rest_framework.exceptions import ValidationError
+from rest_framework_simplejwt.tokens import RefreshToken
 from datetime import date, timedelta, datetime
 from decimal import Decimal
 
-from api.models import Note, UserProfile, Venue, Booking, CanceledBooking
+from api.authentication import ClaimsTokenObtainPairSerializer
+from api.benchmark import ENDPOINTS, compare, parse_size, run_benchmark
+from api.fake_khalti import FakeKhaltiServer
+from api import importer, khalti
+from api.querycount import record_queries
+from api.synthetic import generate
+from api.models import Note, UserProfile, Venue, Booking, CanceledBooking, PaymentIntent, VenueDailyOccupancy
 from api.serializers import (
     NoteSerializer, UserSerializers, VenueSerializer,
     BookingSerializer, CanceledBookingSerializer
@@ -16,6 +31,14 @@ from api.serializers import (
 # ---------------------- Fixtures ----------------------
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Ids are reused between tests, so cached payloads must not leak across
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
@@ -110,6 +133,56 @@ def note(create_user):
         author=user
     )
 
+@pytest.fixture
+def fake_khalti(settings):
+    server = FakeKhaltiServer()
+    server.start_in_thread()
+    settings.KHALTI_INITIATE_URL = server.initiate_url
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def query_budget():
+    """
+    `with query_budget(3):` fails the test when the block runs more than 3
+    queries (or spends more than max_ms in the database) and lists the SQL.
+    """
+    @contextmanager
+    def _query_budget(max_queries, max_ms=None, label="block"):
+        with record_queries() as queries:
+            yield queries
+        problems = []
+        if queries.count > max_queries:
+            problems.append(f"{queries.count} queries, budget {max_queries}")
+        if max_ms is not None and queries.total_ms > max_ms:
+            problems.append(f"{queries.total_ms:.1f}ms, budget {max_ms}ms")
+        if problems:
+            pytest.fail(f"{label} over budget ({'; '.join(problems)}):\n{queries.report()}", pytrace=False)
+    return _query_budget
+
+
+@pytest.fixture
+def budget_data(venue, create_user):
+    # Several rows per table, so a per-row query shows up as a blown budget
+    guest = create_user(username="guest")
+    UserProfile.objects.create(username="guest", email="guest@example.com")
+    venues = [venue] + [
+        Venue.objects.create(venuename=f"Venue {i}", venueaddress="Kathmandu", review="ok",
+                             features="Parking", description="Hall", imageurl=[],
+                             venueownerid=venue.venueownerid)
+        for i in range(2)
+    ]
+    for v in venues:
+        for i in range(3):
+            Booking.objects.create(user=guest, venue=v,
+                                   start_date=date(2030, 1, 1) + timedelta(days=3 * i),
+                                   end_date=date(2030, 1, 2) + timedelta(days=3 * i))
+    CanceledBooking.objects.create(venue_name=venue.venuename, user_id=guest.id, user_name="guest",
+                                   start_date=date(2030, 2, 1), end_date=date(2030, 2, 2))
+    return {"owner": venue.venueownerid, "guest": guest, "venue": venue}
+
 # ---------------------- Model Tests ----------------------
 
 
@@ -162,6 +235,32 @@ class TestSerializers:
         assert serializer.data["description"] == venue.description
         assert "booked_dates" in serializer.data
 
+    def test_venue_serializer_batches_booked_dates(self, venue, booking, create_user, django_assert_num_queries):
+        UserProfile.objects.create(id=booking.user.id, username="bookinguser",
+                                   email="booker@example.com", phoneNumber=9800000000)
+        for i in range(5):
+            other = Venue.objects.create(
+                venuename=f"Venue {i}", venueaddress="Street", review="", features="",
+                description="", imageurl=[], venueownerid=venue.venueownerid)
+            Booking.objects.create(
+                user=create_user(username=f"guest{i}"), venue=other,
+                start_date=date(2030, 1, 1), end_date=date(2030, 1, 2))
+
+        # Venues, bookings and profiles: three queries regardless of size
+        with django_assert_num_queries(3):
+            data = VenueSerializer(Venue.objects.all(), many=True).data
+
+        first = next(v for v in data if v["venueid"] == venue.venueid)
+        assert first["booked_dates"] == [{
+            "id": booking.id,
+            "start_date": booking.start_date,
+            "end_date": booking.end_date,
+            "user": {"username": "bookinguser", "email": "booker@example.com",
+                     "phoneNumber": 9800000000},
+        }]
+        assert all(v["booked_dates"][0]["user"]["username"] == "Unknown"
+                   for v in data if v["venueid"] != venue.venueid)
+
     def test_booking_serializer(self, booking):
         serializer = BookingSerializer(booking)
         assert serializer.data["venue"] == booking.venue.venueid
@@ -170,6 +269,24 @@ class TestSerializers:
         assert serializer.data["verified"] == booking.verified
         assert serializer.data["venue_name"] == booking.venue.venuename
 
+    def test_booker_profiles_are_linked_and_shared_per_request(self, booking, django_assert_num_queries):
+        # Registered later, under the account's username, and with an id
+        # that does not match the user's
+        UserProfile.objects.create(id=booking.user.id + 100, username="bookinguser",
+                                   email="booker@example.com")
+        profile = UserProfile.objects.get(username="bookinguser")
+        assert profile.user == booking.user
+        assert str(profile) == "bookinguser"
+
+        request = APIRequestFactory().get("/api/bookings/")
+        context = {"request": Request(request)}
+        with django_assert_num_queries(1):
+            first = BookingSerializer(booking, context=context).data
+            # A second serializer in the same request reuses the fetched profile
+            second = BookingSerializer([booking], many=True, context=context).data
+        assert first["user_info"]["email"] == "booker@example.com"
+        assert second[0]["user_info"] == first["user_info"]
+
     def test_canceled_booking_serializer(self, canceled_booking):
         serializer = CanceledBookingSerializer(canceled_booking)
         assert serializer.data["venue_name"] == canceled_booking.venue_name
@@ -200,6 +317,41 @@ class TestSerializers:
         assert "This venue is already booked for the selected dates" in str(
             serializer.errors)
 
+    def test_booking_serializer_reports_constraint_race(self, venue, create_user):
+        data = {
+            "user": create_user(username="racer").id,
+            "venue": venue.venueid,
+            "start_date": "2031-03-01",
+            "end_date": "2031-03-04"
+        }
+        serializer = BookingSerializer(data=data)
+        assert serializer.is_valid()
+
+        # Another request books the same dates between validate() and save()
+        Booking.objects.create(
+            user=create_user(username="winner"), venue=venue,
+            start_date=date(2031, 3, 1), end_date=date(2031, 3, 4))
+
+        with pytest.raises(ValidationError) as excinfo:
+            serializer.save()
+        assert "already booked" in str(excinfo.value.detail)
+
+    @pytest.mark.skipif(connection.vendor != "postgresql",
+                        reason="exclusion constraints need PostgreSQL")
+    def test_overlapping_booking_rejected_by_database(self, booking):
+        with pytest.raises(IntegrityError):
+            with transaction.atomic():
+                Booking.objects.create(
+                    user=booking.user, venue=booking.venue,
+                    start_date=booking.end_date,
+                    end_date=booking.end_date + timedelta(days=2))
+
+        # Adjacent ranges do not overlap
+        Booking.objects.create(
+            user=booking.user, venue=booking.venue,
+            start_date=booking.end_date + timedelta(days=1),
+            end_date=booking.end_date + timedelta(days=2))
+
 # ---------------------- View Tests ----------------------
 
 
@@ -218,6 +370,15 @@ class TestViews:
         assert response.status_code == status.HTTP_201_CREATED
         assert UserProfile.objects.filter(username="newuser").exists()
 
+    def test_register_profile_twice(self, api_client, create_user):
+        user = create_user(username="twice")
+        data = {"username": "twice", "email": "twice@example.com", "is_venue_owner": False}
+        assert api_client.post(reverse("register"), data, format="json").status_code == status.HTTP_201_CREATED
+        assert api_client.post(reverse("register"), data, format="json").status_code == status.HTTP_201_CREATED
+        # The account stays linked to its first profile
+        first, second = UserProfile.objects.filter(username="twice").order_by("id")
+        assert (first.user_id, second.user_id) == (user.id, None)
+
     def test_note_list_create_view(self, authenticated_client):
         client, user = authenticated_client
         url = reverse("note-list")
@@ -242,6 +403,76 @@ class TestViews:
         assert response.status_code == status.HTTP_200_OK
         assert response.data["username"] == user_profile.username
 
+    def test_show_profile_from_token_claims(self, api_client, create_user, django_assert_num_queries):
+        user = create_user(email="me@example.com")
+        response = api_client.post("/api/token/", {"username": "testuser", "password": "testpass123"})
+        access = response.data["access"]
+
+        # Everything comes from the signed token
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        with django_assert_num_queries(0):
+            response = api_client.get(reverse("user-detail"))
+        assert response.data == {"id": user.id, "username": "testuser", "email": "me@example.com"}
+
+        # Tokens without the claims load the user once, then reuse it
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+        with django_assert_num_queries(1):
+            api_client.get(reverse("user-detail"))
+        with django_assert_num_queries(0):
+            response = api_client.get(reverse("user-detail"))
+        assert response.data["email"] == "me@example.com"
+
+    def test_claims_tokens_on_read_only_views(self, api_client, venue, booking):
+        def bearer(user):
+            access = ClaimsTokenObtainPairSerializer.get_token(user).access_token
+            api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+        # The token's user id is a string claim; owners must still match
+        owner = venue.venueownerid
+        bearer(owner)
+        assert api_client.get(reverse("user-detail")).data["id"] == owner.id
+        url = reverse("owner-stats", kwargs={"venueownerid": owner.id})
+        assert api_client.get(url).status_code == status.HTTP_200_OK
+        other = reverse("owner-stats", kwargs={"venueownerid": booking.user.id})
+        assert api_client.get(other).status_code == status.HTTP_403_FORBIDDEN
+        assert api_client.get(reverse("export-bookings")).status_code == status.HTTP_403_FORBIDDEN
+
+        bearer(User.objects.create_superuser("finance", password="x"))
+        for name in ("export-bookings", "export-canceled-bookings"):
+            response = api_client.get(reverse(name))
+            assert response.status_code == status.HTTP_200_OK
+            b"".join(response.streaming_content)
+        assert api_client.get(other).status_code == status.HTTP_200_OK
+
+        # Admin rights come from the User, not the token: a demoted admin
+        # loses them once the cached User expires
+        admin = User.objects.get(username="finance")
+        admin.is_staff = admin.is_superuser = False
+        admin.save()
+        cache.clear()
+        assert api_client.get(reverse("export-bookings")).status_code == status.HTTP_403_FORBIDDEN
+        assert api_client.get(other).status_code == status.HTTP_403_FORBIDDEN
+        admin.is_active = False
+        admin.save()
+        cache.clear()
+        assert api_client.get(other).status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_token_refresh_rereads_claims(self, api_client, create_user):
+        user = create_user(email="old@example.com")
+        refresh = str(ClaimsTokenObtainPairSerializer.get_token(user))
+        user.email = "new@example.com"
+        user.save()
+
+        response = api_client.post("/api/token/refresh/", {"refresh": refresh})
+        assert response.status_code == status.HTTP_200_OK
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        assert api_client.get(reverse("user-detail")).data["email"] == "new@example.com"
+
+        user.is_active = False
+        user.save()
+        response = api_client.post("/api/token/refresh/", {"refresh": refresh})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
     def test_venue_view_list(self, api_client, venue):
         url = reverse("venues-list")
         response = api_client.get(url)
@@ -256,6 +487,79 @@ class TestViews:
         assert response.data["venuename"] == venue.venuename
         assert response.data["description"] == venue.description
 
+    def test_venue_responses_are_cached_and_invalidated(self, api_client, venue, create_user, django_assert_num_queries):
+        detail_url = reverse("venues", kwargs={"venueid": venue.venueid})
+        list_url = reverse("venues-list")
+
+        assert api_client.get(detail_url)["X-Cache"] == "MISS"
+        assert api_client.get(list_url)["X-Cache"] == "MISS"
+        with django_assert_num_queries(0):
+            assert api_client.get(detail_url)["X-Cache"] == "HIT"
+            assert api_client.get(list_url)["X-Cache"] == "HIT"
+
+        # A new booking changes booked_dates of the venue
+        Booking.objects.create(user=create_user(username="guest"), venue=venue,
+                               start_date=date(2030, 5, 1), end_date=date(2030, 5, 2))
+        response = api_client.get(detail_url)
+        assert response["X-Cache"] == "MISS"
+        assert len(response.data["booked_dates"]) == 1
+
+        venue.venuename = "Renamed Venue"
+        venue.save()
+        response = api_client.get(list_url)
+        assert response["X-Cache"] == "MISS"
+        assert response.data[0]["venuename"] == "Renamed Venue"
+
+        admin = User.objects.create_superuser("admin", "admin@example.com", "adminpass")
+        api_client.force_authenticate(user=admin)
+        response = api_client.get(reverse("cache-stats"))
+        assert response.data["hits"] == 2
+        assert response.data["misses"] == 4
+
+    def test_conditional_get_on_venues_and_bookings(self, api_client, venue, booking, django_assert_num_queries):
+        list_url = reverse("venues-list")
+        response = api_client.get(list_url)
+        etag = response["ETag"]
+        assert etag.startswith('"')
+
+        # The tag is cached with the payload, so no query is needed
+        with django_assert_num_queries(0):
+            response = api_client.get(list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+        # Pages are tagged separately
+        assert api_client.get(list_url, {"page_size": 1})["ETag"] != etag
+
+        bookings_url = reverse("userbooking", kwargs={"user_id": booking.user.id})
+        bookings_etag = api_client.get(bookings_url)["ETag"]
+        response = api_client.get(bookings_url, HTTP_IF_NONE_MATCH=bookings_etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        # Verifying the booking changes both payloads
+        booking.verified = True
+        booking.save()
+        assert api_client.get(list_url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+        response = api_client.get(bookings_url, HTTP_IF_NONE_MATCH=bookings_etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data[0]["verified"] is True
+
+        # So does editing the booker's profile, which the bookings embed
+        bookings_etag = response["ETag"]
+        profile = UserProfile.objects.create(username=booking.user.username, email="new@example.com")
+        response = api_client.get(bookings_url, HTTP_IF_NONE_MATCH=bookings_etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data[0]["user_info"]["email"] == "new@example.com"
+        bookings_etag = response["ETag"]
+        profile.email = "newer@example.com"
+        profile.save()
+        response = api_client.get(bookings_url, HTTP_IF_NONE_MATCH=bookings_etag)
+        assert response.status_code == status.HTTP_200_OK
+
+        # Deleting leaves no timestamp behind but still changes the tag
+        etag = api_client.get(list_url)["ETag"]
+        booking.delete()
+        assert api_client.get(list_url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
     def test_user_booking_view(self, api_client, booking):
         url = reverse("userbooking", kwargs={"user_id": booking.user.id})
         response = api_client.get(url)
@@ -264,6 +568,235 @@ class TestViews:
         assert response.data[0]["venue"] == booking.venue.venueid
         assert response.data[0]["start_date"] == booking.start_date.isoformat()
 
+    def test_booking_lists_query_budget(self, api_client, venue, create_user, django_assert_num_queries):
+        guest = create_user(username="guest")
+        UserProfile.objects.create(id=guest.id, username="guest", email="guest@example.com")
+        for i in range(10):
+            Booking.objects.create(
+                user=guest, venue=venue,
+                start_date=date(2030, 1, 1) + timedelta(days=3 * i),
+                end_date=date(2030, 1, 2) + timedelta(days=3 * i))
+
+        # Bookings joined with their venue, then the booker profiles
+        with django_assert_num_queries(2):
+            response = api_client.get("/api/bookings/")
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 10
+        assert response.data[0]["venue_name"] == venue.venuename
+        assert response.data[0]["user_info"]["username"] == "guest"
+
+        # Computed fields keep the columns they are built from
+        with django_assert_num_queries(2):
+            response = api_client.get("/api/bookings/?fields=user_info")
+        assert response.data[0] == {"user_info": response.data[1]["user_info"]}
+
+        # One more for the ETag's change marker
+        url = reverse("userbooking", kwargs={"user_id": guest.id})
+        with django_assert_num_queries(3):
+            response = api_client.get(url)
+        assert len(response.data) == 10
+
+    # (url name, kwargs from budget_data, query string, queries allowed).
+    # Budgets hold for any number of rows; raise one only with a reason.
+    ENDPOINT_QUERY_BUDGETS = [
+        ("venues-list", lambda d: {}, "", 5),
+        ("venues", lambda d: {"venueownerid": d["owner"].id}, "", 5),
+        ("venues", lambda d: {"venueid": d["venue"].venueid}, "", 5),
+        ("venues-available", lambda d: {}, "?start=2030-01-01&end=2030-01-02", 1),
+        ("venues-search", lambda d: {}, "?q=hall", 2),
+        ("venue-calendar", lambda d: {"venueid": d["venue"].venueid}, "?from=2030-01-01&months=1", 2),
+        ("venue-list", lambda d: {}, "", 3),
+        ("booking-list", lambda d: {}, "", 2),
+        ("userbooking", lambda d: {"user_id": d["guest"].id}, "", 3),
+        ("canceled-bookings", lambda d: {"user_id": d["guest"].id}, "", 1),
+        ("owner-stats", lambda d: {"venueownerid": d["owner"].id}, "", 1),
+        ("user-detail", lambda d: {}, "", 0),
+    ]
+
+    @pytest.mark.parametrize("name,kwargs,query,budget", ENDPOINT_QUERY_BUDGETS)
+    def test_endpoint_query_budgets(self, api_client, budget_data, query_budget, name, kwargs, query, budget):
+        api_client.force_authenticate(user=budget_data["owner"])
+        url = reverse(name, kwargs=kwargs(budget_data)) + query
+        with query_budget(budget, label=url) as queries:
+            response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        # The middleware reports the same statements in its headers
+        assert int(response["X-DB-Queries"]) == queries.count
+        assert response["Server-Timing"].startswith("db;dur=")
+
+    def test_sparse_fields_and_expand(self, api_client, venue, booking, django_assert_num_queries):
+        # The two ETag change markers and the venues; booked_dates is skipped unless expanded
+        with django_assert_num_queries(3):
+            response = api_client.get(reverse("venues-list") + "?fields=venueid,venuename")
+        assert response.status_code == status.HTTP_200_OK
+        assert set(response.data[0]) == {"venueid", "venuename"}
+
+        response = api_client.get(reverse("venues-list") + "?fields=venueid&expand=booked_dates")
+        assert set(response.data[0]) == {"venueid", "booked_dates"}
+        assert response.data[0]["booked_dates"][0]["start_date"] == booking.start_date
+
+        url = reverse("venues", kwargs={"venueid": venue.venueid})
+        assert set(api_client.get(url + "?fields=venuename").data) == {"venuename"}
+        assert "booked_dates" in api_client.get(url).data
+
+        # No profile lookups when user_info is not asked for
+        with django_assert_num_queries(1):
+            response = api_client.get("/api/bookings/?fields=id,verified")
+        assert response.data == [{"id": booking.id, "verified": booking.verified}]
+
+    def test_venue_list_cursor_pagination(self, api_client, venue):
+        for i in range(4):
+            Venue.objects.create(
+                venuename=f"Venue {i}", venueaddress="Street", review="", features="",
+                description="", imageurl=[], venueownerid=venue.venueownerid)
+
+        # Without pagination parameters the plain list is returned
+        response = api_client.get(reverse("venues-list"))
+        assert len(response.data) == 5
+
+        seen = []
+        url = reverse("venues-list") + "?page_size=2"
+        while url:
+            response = api_client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert len(response.data["results"]) <= 2
+            seen.extend(v["venueid"] for v in response.data["results"])
+            url = response.data["next"]
+        assert seen == sorted(Venue.objects.values_list("venueid", flat=True))
+
+    def test_booking_viewset_cursor_pagination(self, api_client, booking):
+        response = api_client.get("/api/bookings/?page_size=1")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["results"][0]["id"] == booking.id
+        assert response.data["next"] is None
+        assert response.data["previous"] is None
+
+    def test_venue_availability(self, api_client, venue, booking, django_assert_num_queries):
+        small = Venue.objects.create(
+            venuename="Small Hall", venueaddress="Street", review="", features="",
+            description="", imageurl=[], venueownerid=venue.venueownerid,
+            min_price=Decimal("50.00"), max_price=Decimal("80.00"), max_capacity=20)
+        url = reverse("venues-available")
+        start = booking.start_date.isoformat()
+        end = (booking.end_date + timedelta(days=5)).isoformat()
+
+        # The booked venue is excluded in a single query
+        with django_assert_num_queries(1):
+            response = api_client.get(url, {"start": start, "end": end})
+        assert response.status_code == status.HTTP_200_OK
+        assert [v["venueid"] for v in response.data] == [small.venueid]
+        assert "booked_dates" not in response.data[0]
+
+        # Days after the booking are free for both venues
+        later = (booking.end_date + timedelta(days=1)).isoformat()
+        response = api_client.get(url, {"start": later, "end": end})
+        assert len(response.data) == 2
+
+        response = api_client.get(url, {"start": later, "end": end, "min_capacity": 50})
+        assert [v["venueid"] for v in response.data] == [venue.venueid]
+        response = api_client.get(url, {"start": later, "end": end, "max_price": "60"})
+        assert [v["venueid"] for v in response.data] == [small.venueid]
+
+        response = api_client.get(url, {"start": later, "end": end, "page_size": 1})
+        assert len(response.data["results"]) == 1
+        assert response.data["next"]
+
+        response = api_client.get(url, {"start": end, "end": start})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        for params in ({"max_price": "NaN"}, {"min_price": "Infinity"}, {"max_price": "abc"}):
+            response = api_client.get(url, {"start": start, "end": end, **params})
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_venue_list_filters_and_ordering(self, api_client, venue):
+        def make(name, price, capacity):
+            return Venue.objects.create(
+                venuename=name, venueaddress="Street", review="", features="", description="",
+                imageurl=[], venueownerid=venue.venueownerid, min_price=Decimal(price),
+                max_price=Decimal(price) * 2, max_capacity=capacity)
+        cheap = make("Cheap", "50.00", 350)
+        grand = make("Grand", "900.00", 1000)
+        make("Tiny", "20.00", 30)
+
+        url = reverse("venues-list")
+        response = api_client.get(url, {"min_capacity": 300, "ordering": "price"})
+        assert [v["venueid"] for v in response.data] == [cheap.venueid, grand.venueid]
+
+        response = api_client.get(url, {"price_gte": "60", "price_lte": "500"})
+        assert [v["venueid"] for v in response.data] == [venue.venueid]
+
+        response = api_client.get("/api/venue/", {"ordering": "-capacity"})
+        assert [v["max_capacity"] for v in response.data] == [1000, 350, 100, 30]
+
+        # Cursor pages follow the requested ordering
+        seen, next_url = [], url + "?ordering=price&page_size=3"
+        while next_url:
+            response = api_client.get(next_url)
+            seen.extend(v["min_price"] for v in response.data["results"])
+            next_url = response.data["next"]
+        assert seen == ["20.00", "50.00", "100.00", "900.00"]
+
+        assert api_client.get(url, {"ordering": "name"}).status_code == status.HTTP_400_BAD_REQUEST
+        assert api_client.get(url, {"price_lte": "cheap"}).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_venue_search(self, api_client, venue):
+        lakeside = Venue.objects.create(
+            venuename="Lakeside Garden", venueaddress="Pokhara", review="", features="Lawn",
+            description="Open air venue by the lake", imageurl=[], venueownerid=venue.venueownerid)
+        hall = Venue.objects.create(
+            venuename="City Hall", venueaddress="Kathmandu", review="", features="Stage",
+            description="Indoor hall with a rooftop garden", imageurl=[], venueownerid=venue.venueownerid)
+        url = reverse("venues-search")
+
+        response = api_client.get(url, {"q": "garden"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 2
+        # A match in the name outranks one in the description
+        assert [v["venueid"] for v in response.data["results"]] == [lakeside.venueid, hall.venueid]
+
+        response = api_client.get(url, {"q": "garden Pokhara"})
+        assert [v["venueid"] for v in response.data["results"]] == [lakeside.venueid]
+
+        # Edits are searchable straight away
+        hall.features = "Parking"
+        hall.save()
+        response = api_client.get(url, {"q": "parking"})
+        assert {v["venueid"] for v in response.data["results"]} == {venue.venueid, hall.venueid}
+
+        response = api_client.get(url, {"q": "garden", "page_size": 1})
+        assert len(response.data["results"]) == 1
+        assert response.data["next"]
+
+        assert api_client.get(url).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_venue_calendar(self, api_client, venue, create_user, django_assert_num_queries):
+        guest = create_user(username="guest")
+        Booking.objects.create(user=guest, venue=venue,
+                               start_date=date(2030, 1, 30), end_date=date(2030, 2, 2))
+        Booking.objects.create(user=guest, venue=venue,
+                               start_date=date(2030, 2, 3), end_date=date(2030, 2, 4))
+        url = reverse("venue-calendar", kwargs={"venueid": venue.venueid})
+
+        response = api_client.get(url, {"from": "2030-01", "months": 2})
+        assert response.status_code == status.HTTP_200_OK
+        # Adjacent bookings are merged into one run
+        assert response.data["ranges"] == [[date(2030, 1, 30), date(2030, 2, 4)]]
+        assert response.data["to"] == date(2030, 2, 28)
+
+        response = api_client.get(url, {"from": "2030-01", "months": 2, "encoding": "bitmap"})
+        assert response.data["months"] == {"2030-01": (1 << 29) | (1 << 30), "2030-02": 0b1111}
+
+        # Served from cache until a booking of this venue changes
+        with django_assert_num_queries(0):
+            api_client.get(url, {"from": "2030-01", "months": 2})
+        Booking.objects.create(user=guest, venue=venue,
+                               start_date=date(2030, 1, 10), end_date=date(2030, 1, 10))
+        response = api_client.get(url, {"from": "2030-01", "months": 2})
+        assert response.data["ranges"][0] == [date(2030, 1, 10), date(2030, 1, 10)]
+
+        response = api_client.get(reverse("venue-calendar", kwargs={"venueid": 99999}))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert api_client.get(url, {"from": "9999-12", "months": 3}).status_code == status.HTTP_400_BAD_REQUEST
+
     def test_booking_viewset_update(self, authenticated_client, booking):
         client, _ = authenticated_client
         url = f"/api/bookings/{booking.id}/"
@@ -273,6 +806,45 @@ class TestViews:
         booking.refresh_from_db()
         assert booking.verified == True
 
+    def test_booking_verify_bulk(self, api_client, venue, booking, create_user, django_assert_num_queries):
+        other_venue = Venue.objects.create(
+            venuename="Elsewhere", venueaddress="Street", review="", features="",
+            description="", imageurl=[], venueownerid=create_user(username="rival"))
+        foreign = Booking.objects.create(user=booking.user, venue=other_venue,
+                                         start_date=date(2030, 1, 1), end_date=date(2030, 1, 2))
+        done = Booking.objects.create(user=booking.user, venue=venue, verified=True,
+                                      start_date=date(2030, 1, 1), end_date=date(2030, 1, 2))
+        before = done.updated_at
+        api_client.force_authenticate(user=venue.venueownerid)
+        url = "/api/bookings/verify-bulk/"
+        api_client.get(reverse("venues", kwargs={"venueid": venue.venueid}))
+
+        # SELECT ... FOR UPDATE of the owner's rows, then one UPDATE each for
+        # the bookings and their daily occupancy rows, in a savepoint
+        with django_assert_num_queries(5):
+            response = api_client.post(url, {"ids": [booking.id, foreign.id, done.id, 999999]},
+                                       format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["results"] == [
+            {"id": booking.id, "status": "updated"},
+            {"id": foreign.id, "status": "not_found"},
+            {"id": done.id, "status": "unchanged"},
+            {"id": 999999, "status": "not_found"},
+        ]
+        booking.refresh_from_db()
+        foreign.refresh_from_db()
+        done.refresh_from_db()
+        assert booking.verified and not foreign.verified and done.updated_at == before
+
+        detail = api_client.get(reverse("venues", kwargs={"venueid": venue.venueid}))
+        assert detail["X-Cache"] == "MISS"
+
+        response = api_client.post(url, {"ids": [booking.id], "verified": False}, format="json")
+        assert response.data["results"] == [{"id": booking.id, "status": "updated"}]
+        assert api_client.post(url, {"ids": []}, format="json").status_code == 400
+        api_client.force_authenticate(user=None)
+        assert api_client.post(url, {"ids": [booking.id]}, format="json").status_code == 401
+
     def test_canceled_booking_view(self, api_client, canceled_booking):
         url = reverse("canceled-bookings",
                       kwargs={"user_id": canceled_booking.user_id})
@@ -282,6 +854,28 @@ class TestViews:
         assert response.data[0]["venue_name"] == canceled_booking.venue_name
         assert response.data[0]["reason"] == canceled_booking.reason
 
+    def test_canceled_booking_cursor_pagination(self, api_client, canceled_booking):
+        for i in range(4):
+            CanceledBooking.objects.create(
+                venue_name="Venue", user_id=canceled_booking.user_id, user_name="canceluser",
+                start_date=date(2030, 1, 1), end_date=date(2030, 1, 2), reason=f"r{i}")
+        CanceledBooking.objects.create(user_id=999, start_date=date(2030, 1, 1),
+                                       end_date=date(2030, 1, 2))
+
+        url = reverse("canceled-bookings", kwargs={"user_id": canceled_booking.user_id})
+        assert len(api_client.get(url).data) == 5
+
+        seen = []
+        url += "?page_size=2"
+        while url:
+            response = api_client.get(url)
+            assert len(response.data["results"]) <= 2
+            seen.extend(c["id"] for c in response.data["results"])
+            url = response.data["next"]
+        expected = CanceledBooking.objects.filter(user_id=canceled_booking.user_id).order_by(
+            "-canceled_at", "-id").values_list("id", flat=True)
+        assert seen == list(expected)
+
     def test_create_canceled_booking(self, api_client):
         url = reverse("canceled-bookings")
         data = {
@@ -297,6 +891,202 @@ class TestViews:
         assert response.status_code == status.HTTP_201_CREATED
         assert CanceledBooking.objects.filter(user_name="canceller").exists()
 
+    def test_owner_stats(self, api_client, venue, create_user, django_assert_num_queries):
+        owner = venue.venueownerid
+        guest = create_user(username="guest")
+        empty = Venue.objects.create(
+            venuename="Empty Hall", venueaddress="Street", review="", features="",
+            description="", imageurl=[], venueownerid=owner)
+        # 29 Jan - 2 Feb counts 2 nights in February; 10 - 11 Feb counts 2
+        Booking.objects.create(user=guest, venue=venue, verified=True,
+                               start_date=date(2030, 1, 29), end_date=date(2030, 2, 2))
+        Booking.objects.create(user=guest, venue=venue,
+                               start_date=date(2030, 2, 10), end_date=date(2030, 2, 11))
+        Booking.objects.create(user=guest, venue=venue,
+                               start_date=date(2030, 3, 10), end_date=date(2030, 3, 11))
+        url = reverse("owner-stats", kwargs={"venueownerid": owner.id}) + "?from=2030-02-01&to=2030-02-28"
+
+        api_client.force_authenticate(user=guest)
+        assert api_client.get(url).status_code == status.HTTP_403_FORBIDDEN
+        api_client.force_authenticate(user=owner)
+
+        with django_assert_num_queries(1):
+            response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        stats = {row["venueid"]: row for row in response.data["venues"]}
+        assert stats[venue.venueid]["booked_nights"] == 4
+        assert stats[venue.venueid]["verified_bookings"] == 1
+        assert stats[venue.venueid]["unverified_bookings"] == 1
+        assert stats[venue.venueid]["occupancy_rate"] == round(4 / 28, 4)
+        assert stats[venue.venueid]["revenue_min"] == Decimal("400.00")
+        assert stats[venue.venueid]["revenue_max"] == Decimal("2000.00")
+        assert stats[empty.venueid]["booked_nights"] == 0
+        assert response.data["totals"]["bookings"] == 2
+
+        assert api_client.get(url)["X-Cache"] == "HIT"
+        Booking.objects.create(user=guest, venue=empty,
+                               start_date=date(2030, 2, 1), end_date=date(2030, 2, 1))
+        response = api_client.get(url)
+        assert response["X-Cache"] == "MISS"
+        assert response.data["totals"]["booked_nights"] == 5
+
+    def test_streaming_exports(self, api_client, booking, canceled_booking, create_user):
+        Booking.objects.create(user=booking.user, venue=booking.venue,
+                               start_date=date(2030, 1, 1), end_date=date(2030, 1, 2))
+        url = reverse("export-bookings")
+        assert api_client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
+        api_client.force_authenticate(user=User.objects.create_superuser("finance", password="x"))
+
+        response = api_client.get(url)
+        assert response.streaming
+        assert response["Content-Type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        assert [row["id"] for row in rows] == sorted(Booking.objects.values_list("id", flat=True))
+        assert rows[0]["venue_name"] == booking.venue.venuename
+        assert rows[0]["start_date"] == booking.start_date.isoformat()
+
+        response = api_client.get(url + "?encoding=csv&start=2029-12-01&end=2030-12-31")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert lines[0].startswith("id,venue_id,venue_name")
+        assert len(lines) == 2 and ",2030-01-01,2030-01-02," in lines[1]
+
+        response = api_client.get(reverse("export-canceled-bookings") + "?encoding=csv")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert len(lines) == 2 and "Change of plans" in lines[1]
+        assert api_client.get(url + "?start=yesterday").status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_khalti_payment_views(self, client, venue, create_user, fake_khalti):
+        user = create_user(username="payer")
+        token = str(RefreshToken.for_user(user).access_token)
+        data = {"user": user.id, "venue": venue.venueid, "start_date": "2030-07-01",
+                "end_date": "2030-07-02", "amount": 10000}
+
+        for name, start_date in [("khalti-payment", "2030-07-01"), ("khalti-payment-async", "2030-08-01")]:
+            response = client.post(reverse(name), {**data, "start_date": start_date, "end_date": start_date},
+                                   content_type="application/json",
+                                   HTTP_AUTHORIZATION=f"Bearer {token}")
+            assert response.status_code == status.HTTP_200_OK
+            assert "pidx=" in response.json()["payment_url"]
+        assert fake_khalti.request_count == 2
+
+        response = client.post(reverse("khalti-payment-async"), data, content_type="application/json")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        Booking.objects.create(user=user, venue=venue,
+                               start_date=date(2030, 9, 2), end_date=date(2030, 9, 3))
+        response = client.post(reverse("khalti-payment-async"),
+                               {**data, "start_date": "2030-09-01", "end_date": "2030-09-02"},
+                               content_type="application/json",
+                               HTTP_AUTHORIZATION=f"Bearer {token}")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert fake_khalti.request_count == 2
+
+    def test_khalti_payment_is_idempotent(self, client, venue, create_user, fake_khalti, django_assert_num_queries):
+        user = create_user(username="payer")
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {RefreshToken.for_user(user).access_token}"}
+        data = {"user": user.id, "venue": venue.venueid, "start_date": "2030-07-01",
+                "end_date": "2030-07-02", "amount": 10000}
+
+        first = client.post(reverse("khalti-payment"), data, content_type="application/json", **headers)
+        payment_url = first.json()["payment_url"]
+        intent = PaymentIntent.objects.get(user=user)
+        assert intent.payment_url == payment_url
+        assert intent.purchase_order_id.startswith(f"order-{user.id}-{venue.venueid}-")
+
+        # Retries, from either view, reuse the intent without Khalti or the
+        # overlap query; only the JWT user lookup hits the database
+        for name in ["khalti-payment", "khalti-payment-async"]:
+            with django_assert_num_queries(1):
+                response = client.post(reverse(name), data, content_type="application/json", **headers)
+            assert response.json()["payment_url"] == payment_url
+        assert fake_khalti.request_count == 1
+
+        # A cold cache falls back to the stored intent
+        cache.clear()
+        response = client.post(reverse("khalti-payment"), data, content_type="application/json", **headers)
+        assert response.json()["payment_url"] == payment_url
+        assert fake_khalti.request_count == 1
+
+        keyed = {**data, "start_date": "2030-10-01", "end_date": "2030-10-01"}
+        response = client.post(reverse("khalti-payment"), keyed, content_type="application/json",
+                               HTTP_IDEMPOTENCY_KEY="checkout-1", **headers)
+        keyed_url = response.json()["payment_url"]
+        response = client.post(reverse("khalti-payment-async"), keyed, content_type="application/json",
+                               HTTP_IDEMPOTENCY_KEY="checkout-1", **headers)
+        assert response.json()["payment_url"] == keyed_url
+        assert fake_khalti.request_count == 2
+
+        response = client.post(reverse("khalti-payment"), {**keyed, "amount": 5000},
+                               content_type="application/json", HTTP_IDEMPOTENCY_KEY="checkout-1", **headers)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_khalti_payment_rejects_bad_requests(self, client, venue, create_user, fake_khalti):
+        user = create_user(username="payer")
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {RefreshToken.for_user(user).access_token}"}
+        data = {"user": user.id, "venue": venue.venueid, "start_date": "2030-07-01",
+                "end_date": "2030-07-02", "amount": 10000}
+
+        for name in ["khalti-payment", "khalti-payment-async"]:
+            for changes, expected in [({"venue": "abc"}, status.HTTP_400_BAD_REQUEST),
+                                      ({"venue": venue.venueid + 1000}, status.HTTP_404_NOT_FOUND),
+                                      ({"amount": -100}, status.HTTP_400_BAD_REQUEST)]:
+                response = client.post(reverse(name), {**data, **changes},
+                                       content_type="application/json", **headers)
+                assert response.status_code == expected
+            response = client.post(reverse(name), data, content_type="application/json",
+                                   HTTP_IDEMPOTENCY_KEY="k" * 256, **headers)
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert fake_khalti.request_count == 0
+        assert not PaymentIntent.objects.exists()
+
+    def test_record_intent_retries_only_idempotency_key_clashes(self, venue, create_user):
+        user = create_user(username="payer")
+        payment = {"venue_id": venue.venueid, "start_date": date(2030, 7, 1),
+                   "end_date": date(2030, 7, 2), "amount": 10000}
+        initiation = {"pidx": "pidx-1", "payment_url": "https://pay.example/1"}
+
+        khalti.record_intent(user, payment, "checkout-1", "order-1", initiation)
+        # An expired intent holding the key is replaced
+        intent = khalti.record_intent(user, payment, "checkout-1", "order-2", initiation)
+        assert list(PaymentIntent.objects.values_list("purchase_order_id", flat=True)) == ["order-2"]
+        assert intent.idempotency_key == "checkout-1"
+
+        # Other integrity errors are not swallowed, and nothing is deleted
+        with pytest.raises(IntegrityError):
+            khalti.record_intent(user, payment, None, "order-2", initiation)
+        assert PaymentIntent.objects.get().pk == intent.pk
+
+    def test_khalti_payment_async_timeout(self, client, venue, create_user, fake_khalti, settings):
+        fake_khalti.delay = 0.5
+        settings.KHALTI_READ_TIMEOUT = 0.1
+        user = create_user(username="payer")
+        token = str(RefreshToken.for_user(user).access_token)
+        data = {"user": user.id, "venue": venue.venueid, "start_date": "2030-07-01",
+                "end_date": "2030-07-02", "amount": 10000}
+
+        response = client.post(reverse("khalti-payment-async"), data, content_type="application/json",
+                               HTTP_AUTHORIZATION=f"Bearer {token}")
+        assert response.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+
+    def test_khalti_async_client_slots_and_shutdown(self, fake_khalti, settings):
+        settings.KHALTI_MAX_CONCURRENCY = 1
+        settings.KHALTI_QUEUE_TIMEOUT = 0.05
+        fake_khalti.delay = 0.3
+        payload = {"amount": 1000, "purchase_order_id": "order-1"}
+
+        async def crowd():
+            results = await asyncio.gather(khalti.ainitiate(payload), khalti.ainitiate(payload),
+                                           return_exceptions=True)
+            client, semaphore = await khalti._async_client()
+            return results, client, semaphore
+
+        results, client, semaphore = asyncio.run(crowd())
+        assert "payment_url" in results[0]
+        assert isinstance(results[1], khalti.KhaltiError) and results[1].status_code == 503
+        # The turned-away caller did not keep a slot, and the loop closed its client
+        assert not semaphore.locked()
+        assert client.is_closed
+
 # ---------------------- Integration Tests ----------------------
 
 
@@ -386,6 +1176,157 @@ class TestIntegration:
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert "already booked" in str(response.content)
 
+    def test_cancel_bookings(self, api_client, venue, booking, create_user):
+        guest = create_user(username="guest")
+        others = [Booking.objects.create(user=guest, venue=venue,
+                                         start_date=date(2030, 1, 1) + timedelta(days=3 * i),
+                                         end_date=date(2030, 1, 2) + timedelta(days=3 * i))
+                  for i in range(3)]
+        url = f"/api/bookings/{booking.id}/cancel/"
+        assert api_client.post(url).status_code == status.HTTP_401_UNAUTHORIZED
+
+        # Someone else's booking looks like a missing one
+        api_client.force_authenticate(user=guest)
+        assert api_client.post(url).status_code == status.HTTP_404_NOT_FOUND
+
+        api_client.force_authenticate(user=booking.user)
+        for body in [["Plans changed"], {"reason": ["Plans changed"]}]:
+            assert api_client.post(url, body, format="json").status_code == status.HTTP_400_BAD_REQUEST
+        response = api_client.post(url, {"reason": "Plans changed"}, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["venue_name"] == venue.venuename
+        assert response.data["user_name"] == booking.user.username
+        assert response.data["reason"] == "Plans changed"
+        assert not Booking.objects.filter(pk=booking.pk).exists()
+        assert not VenueDailyOccupancy.objects.filter(booking_id=booking.pk).exists()
+
+        # The venue owner cancels the guest's bookings in one call
+        api_client.force_authenticate(user=venue.venueownerid)
+        ids = [others[0].id, booking.id, others[2].id]
+        response = api_client.post("/api/bookings/cancel-bulk/", {"ids": ids}, format="json")
+        assert [r["status"] for r in response.data["results"]] == ["canceled", "not_found", "canceled"]
+        assert list(Booking.objects.values_list("id", flat=True)) == [others[1].id]
+        assert CanceledBooking.objects.filter(user_id=guest.id).count() == 2
+
+    def test_daily_occupancy_rollup(self, api_client, venue, create_user):
+        def days():
+            return list(VenueDailyOccupancy.objects.filter(venue=venue).order_by("day")
+                        .values_list("day", "verified"))
+
+        guest = create_user(username="guest")
+        booking = Booking.objects.create(user=guest, venue=venue,
+                                         start_date=date(2030, 1, 30), end_date=date(2030, 2, 1))
+        assert days() == [(date(2030, 1, 30), False), (date(2030, 1, 31), False),
+                          (date(2030, 2, 1), False)]
+
+        api_client.patch(f"/api/bookings/{booking.id}/", {"verified": True}, format="json")
+        assert all(verified for _, verified in days())
+
+        booking.refresh_from_db()
+        booking.end_date = date(2030, 1, 30)
+        booking.save()
+        assert days() == [(date(2030, 1, 30), True)]
+
+        api_client.force_authenticate(user=venue.venueownerid)
+        api_client.post("/api/bookings/verify-bulk/", {"ids": [booking.id], "verified": False},
+                        format="json")
+        assert days() == [(date(2030, 1, 30), False)]
+
+        VenueDailyOccupancy.objects.all().delete()
+        call_command("rebuild_occupancy", "--venue", str(venue.venueid), stdout=StringIO())
+        assert days() == [(date(2030, 1, 30), False)]
+
+        booking.delete()
+        assert days() == []
+
+    def test_import_data_command(self, tmp_path, venue, booking, create_user):
+        owner = venue.venueownerid
+        venues = tmp_path / "venues.csv"
+        venues.write_text(
+            "venuename,venueaddress,features,description,imageurl,venueownerid,max_capacity\n"
+            f"Hall A,Street 1,Stage,Big,[],{owner.id},300\n"
+            f"Hall B,Street 2,Garden,Small,[],{owner.id},\n"
+            "Hall C,Street 3,Roof,Nowhere,[],999999,50\n")
+        out, err = StringIO(), StringIO()
+        call_command("import_data", "venues", str(venues), "--batch-size", "2",
+                     stdout=out, stderr=err)
+        assert "Imported 2 venues, rejected 1 rows" in out.getvalue()
+        assert "line 4" in err.getvalue() and "venueownerid" in err.getvalue()
+        assert Venue.objects.get(venuename="Hall B").max_capacity == 100
+
+        guest = create_user(username="guest")
+        rows = [
+            {"venue": venue.venueid, "user": guest.id, "start_date": "2020-01-01", "end_date": "2020-01-03"},
+            # Overlaps the row above within the same batch
+            {"venue": venue.venueid, "user": guest.id, "start_date": "2020-01-03", "end_date": "2020-01-04"},
+            # Overlaps the stored fixture booking
+            {"venue": venue.venueid, "user": guest.id, "start_date": booking.end_date.isoformat(),
+             "end_date": (booking.end_date + timedelta(days=1)).isoformat()},
+            {"venue": venue.venueid, "user": guest.id, "start_date": "2020-02-02", "end_date": "2020-02-01"},
+        ]
+        bookings = tmp_path / "bookings.jsonl"
+        bookings.write_text("\n".join(json.dumps(row) for row in rows) + "\nnot json\n")
+        out, err = StringIO(), StringIO()
+        call_command("import_data", "bookings", str(bookings), stdout=out, stderr=err)
+        assert "Imported 1 bookings, rejected 4 rows" in out.getvalue()
+        assert err.getvalue().count("already booked") == 2
+        assert Booking.objects.filter(user=guest).count() == 1
+
+    def test_import_bookings_checks_only_the_batch_periods(self, venue, create_user):
+        guest = create_user(username="guest")
+        Booking.objects.create(venue=venue, user=guest, start_date=date(2029, 6, 2),
+                               end_date=date(2029, 6, 2))
+        dates = [("2020-06-01", "2020-06-03"), ("2020-06-03", "2020-06-05"),
+                 ("2020-06-07", "2020-06-07"), ("2029-06-01", "2029-06-02")]
+        rows = [(n, {"venue": venue.venueid, "user": guest.id, "start_date": start, "end_date": end}, None)
+                for n, (start, end) in enumerate(dates, start=1)]
+
+        # Only the bookings overlapping a row are loaded, not the nine years between them
+        valid = [(n, {"venue": row["venue"], "start_date": date.fromisoformat(row["start_date"]),
+                      "end_date": date.fromisoformat(row["end_date"])}) for n, row, _ in rows]
+        assert importer._periods(valid, {venue.venueid}) == [
+            (venue.venueid, date(2020, 6, 1), date(2020, 6, 5)),
+            (venue.venueid, date(2020, 6, 7), date(2020, 6, 7)),
+            (venue.venueid, date(2029, 6, 1), date(2029, 6, 2)),
+        ]
+        assert importer._periods(valid, set()) == []
+
+        saved, rejected = importer.import_bookings(rows)
+        assert saved == 2
+        assert [line for line, _ in rejected] == [2, 4]
+
+    # The benchmark empties the database between sizes, which PostgreSQL
+    # refuses inside the per-test transaction
+    @pytest.mark.django_db(transaction=True)
+    def test_synthetic_data_and_benchmark(self):
+        anchor = date(2030, 1, 1)
+        counts = generate(venues=4, users=10, bookings=30, seed=7, anchor=anchor, prefix="a")
+        assert counts == {"users": 10, "venues": 4, "bookings": 30, "canceled": 1}
+        first = list(Booking.objects.order_by("id").values_list("start_date", "end_date"))
+
+        # No two bookings of a venue share a day, and the rollup covers them all
+        nights = sum((end - start).days + 1 for start, end in first)
+        assert VenueDailyOccupancy.objects.count() == nights
+        assert UserProfile.objects.filter(username__startswith="a-", is_venue_owner=True).count() == 2
+
+        # The same seed gives the same bookings
+        generate(venues=4, users=10, bookings=30, seed=7, anchor=anchor, prefix="b")
+        second = list(Booking.objects.filter(user__username__startswith="b-")
+                      .order_by("id").values_list("start_date", "end_date"))
+        assert second == first
+
+        results = run_benchmark([parse_size("3:6:20")], repeat=2)
+        endpoints = results["runs"][0]["endpoints"]
+        assert set(endpoints) == set(ENDPOINTS)
+        assert all(stats["status"] == stats["expected_status"] for stats in endpoints.values())
+        assert compare(results, results) == []
+
+        worse = json.loads(json.dumps(results))
+        worse["runs"][0]["endpoints"]["venues-list"]["queries"] += 1
+        assert compare(results, worse) == [
+            "venues-list @ {'bookings': 20, 'users': 6, 'venues': 3}: queries "
+            f"{endpoints['venues-list']['queries']} -> {endpoints['venues-list']['queries'] + 1}"]
+
 # ---------------------- Edge Cases and Error Handling ----------------------
 
 
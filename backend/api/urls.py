@@ -23,6 +23,12 @@ urlpatterns = [
      path('venues/', views.VenueViewList.as_view(), name='venues-list'),
      path('venues/owner/<int:venueownerid>/', views.VenueViewList.as_view(),
           name='venues'),
+     path('venues/available/', views.VenueAvailabilityView.as_view(),
+          name='venues-available'),
+     path('venues/search/', views.VenueSearchView.as_view(),
+          name='venues-search'),
+     path('venues/<int:venueid>/calendar/', views.VenueCalendarView.as_view(),
+          name='venue-calendar'),
 
      path('canceled/', views.CanceledBookingViewSet.as_view(), name='canceled-bookings'),
      path('canceled/<int:user_id>/', views.CanceledBookingViewSet.as_view(),
@@ -32,7 +38,15 @@ urlpatterns = [
           name='venues'),
      path('userbookings/<int:user_id>/', views.UserBookingView.as_view(),
           name='userbooking'),
+     path('owners/<int:venueownerid>/stats/', views.OwnerStatsView.as_view(),
+          name='owner-stats'),
+     path('cache/stats/', views.CacheStatsView.as_view(), name='cache-stats'),
+     path('export/bookings/', views.BookingExportView.as_view(), name='export-bookings'),
+     path('export/canceled/', views.CanceledBookingExportView.as_view(),
+          name='export-canceled-bookings'),
      path('create-khalti-payment/', views.KhaltiPaymentView.as_view(), name='khalti-payment'),
+     path('create-khalti-payment/async/', views.AsyncKhaltiPaymentView.as_view(),
+          name='khalti-payment-async'),
 
      path('', include(router.urls))
 ]
@@ -1,30 +1,56 @@
-from datetime import datetime
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from functools import partial
 from django.conf import settings
-import requests
+from asgiref.sync import sync_to_async
 from rest_framework.permissions import AllowAny
 from rest_framework import status
 from django.shortcuts import render
 from django.contrib.auth.models import User
 from rest_framework import generics, status
 from rest_framework.decorators import action
-from .serializers import UserSerializer, NoteSerializer, UserSerializers, BookingStatusSerializer, showProfileSerializer, VenueSerializer, BookingSerializer, VenueRegisterSerializer
-from .models import Note, UserProfile, Venue, Booking
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from .serializers import UserSerializer, NoteSerializer, UserSerializers, BookingStatusSerializer, showProfileSerializer, VenueSerializer, BookingSerializer, VenueRegisterSerializer, VenueSummarySerializer, BulkVerifySerializer, CancelBookingsSerializer, CancelReasonSerializer
+from .models import Note, UserProfile, Venue, Booking, VenueDailyOccupancy
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from .models import Note, UserProfile
 from rest_framework import viewsets
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.authentication import SessionAuthentication
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.parsers import JSONParser
 from django.shortcuts import render, get_object_or_404
 from django.views.decorators.http import require_GET
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from django.core.cache import cache
 from .models import CanceledBooking
 
 
 from .serializers import CanceledBookingSerializer
+from .pagination import (VenueCursorPagination, BookingCursorPagination,
+                         CanceledBookingCursorPagination, SearchPagination)
+from .search import search_venues
+from .filters import filter_venues
+from .caching import versioned_key, cached_response, cache_stats, query_key, invalidate_venue
+from .conditional import conditional_response, venues_etag, user_bookings_etag
+from . import khalti
+from .khalti import KhaltiError, PaymentRequestError, parse_payment_request
+from .occupancy import month_start, add_months, occupied_ranges, month_bitmaps
+from .stats import owner_stats
+from .cancellation import cancel_bookings
+from .authentication import CachedUserJWTAuthentication, ClaimsJWTAuthentication
+from .export import (BOOKING_COLUMNS, CANCELED_BOOKING_COLUMNS, ENCODINGS,
+                     booking_rows, canceled_booking_rows, chunked)
 
 
 class CanceledBookingViewSet(APIView):
@@ -44,7 +70,14 @@ class CanceledBookingViewSet(APIView):
         # Check if user_id is passed in the URL
         user_id = self.kwargs.get('user_id', None)
         queryset = self.get_queryset(user_id)
-        serializer = self.serializer_class(queryset, many=True)
+
+        paginator = CanceledBookingCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        if page is not None:
+            serializer = self.serializer_class(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
+
+        serializer = self.serializer_class(queryset.order_by('-canceled_at', '-id'), many=True)
         return Response(serializer.data)
 
     def post(self, request, *args, **kwargs):
@@ -57,6 +90,7 @@ class CanceledBookingViewSet(APIView):
 
 
 class ShowProfile(APIView):
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [AllowAny]
 
     def get(self, request):
@@ -126,21 +160,53 @@ class UserProfileDetailView(APIView):
             )
 
 
+def venue_detail_response(request, venue_id):
+    venues = VenueSerializer.restrict_queryset(Venue.objects.filter(pk=venue_id), request)
+    venue = venues.first()
+    if venue:
+        serializer = VenueSerializer(venue, context={'request': request})
+        return Response(serializer.data)
+    return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+
+def cached_venue_detail(request, venue_id, build=None):
+    query = query_key(request)
+    return cached_response(
+        request, versioned_key('venue', venue_id, query),
+        build or partial(venue_detail_response, request, venue_id),
+        partial(venues_etag, Venue.objects.filter(pk=venue_id), query))
+
+
 class VenueViewId(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, venueid):
-        venue = Venue.objects.filter(venueid=venueid).first()
-        if venue:
-            serializer = VenueSerializer(venue)
-            return Response(serializer.data)
-        return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        return cached_venue_detail(request, venueid)
 
 
 class VenueViewSet(viewsets.ModelViewSet):
     permission_classes = [AllowAny]
     queryset = Venue.objects.all()
     serializer_class = VenueSerializer
+    pagination_class = VenueCursorPagination
+
+    def get_queryset(self):
+        venues = VenueSerializer.restrict_queryset(super().get_queryset(), self.request)
+        if self.action == 'list':
+            venues = filter_venues(venues, self.request.query_params)
+        return venues
+
+    def list(self, request, *args, **kwargs):
+        key = versioned_key('venue-list', 'all', 'viewset', query_key(request))
+        return cached_response(request, key, partial(super().list, request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            venue_id = int(kwargs['pk'])
+        except ValueError:
+            return super().retrieve(request, *args, **kwargs)
+        return cached_venue_detail(request, venue_id,
+                                   partial(super().retrieve, request, *args, **kwargs))
 
 
 class VenueViewList(APIView):
@@ -150,22 +216,246 @@ class VenueViewList(APIView):
         # Check if 'id' query parameter is passed to get a single venue
         venue_id = request.query_params.get('id')
         if venue_id:
-            venue = Venue.objects.filter(pk=venue_id).first()
-            if venue:
-                serializer = VenueSerializer(venue)
-                return Response(serializer.data)
-            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+            try:
+                venue_id = int(venue_id)
+            except ValueError:
+                return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+            return cached_venue_detail(request, venue_id)
 
         # If venueownerid is in the path, filter by it
         if venueownerid:
             venues = Venue.objects.filter(venueownerid=venueownerid)
         else:
             venues = Venue.objects.all()
+        venues = filter_venues(venues, request.query_params)
+        venues = VenueSerializer.restrict_queryset(venues, request)
+
+        key = versioned_key('venue-list', venueownerid or 'all', 'list', query_key(request))
+        return cached_response(
+            request, key, partial(self.list_venues, request, venues),
+            partial(venues_etag, venues, query_key(request)))
+
+    def list_venues(self, request, venues):
+        paginator = VenueCursorPagination()
+        page = paginator.paginate_queryset(venues, request, view=self)
+        if page is not None:
+            serializer = VenueSerializer(page, many=True, context={'request': request})
+            return paginator.get_paginated_response(serializer.data)
+
+        serializer = VenueSerializer(venues, many=True, context={'request': request})
+        return Response(serializer.data)
+
+
+class CacheStatsView(APIView):
+    """Hit/miss counters of the venue response cache."""
+    authentication_classes = [CachedUserJWTAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(cache_stats())
+
+
+class ExportView(APIView):
+    """
+    Streams every row as NDJSON (default) or ?encoding=csv, optionally only
+    those starting between ?start= and ?end=. Rows are read with a chunked
+    iterator and written as they are produced, so memory stays flat however
+    many rows there are.
+    """
+    authentication_classes = [CachedUserJWTAuthentication]
+    permission_classes = [IsAdminUser]
+    name = None
+    columns = None
+    rows = None
+
+    def get(self, request):
+        encoding = request.query_params.get('encoding', 'ndjson')
+        if encoding not in ENCODINGS:
+            return Response({"detail": "encoding must be ndjson or csv."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            start_date, end_date = (
+                datetime.strptime(request.query_params[param], "%Y-%m-%d").date()
+                if request.query_params.get(param) else None
+                for param in ('start', 'end'))
+        except ValueError:
+            return Response({"detail": "Invalid date format. Use YYYY-MM-DD."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        lines, content_type = ENCODINGS[encoding]
+        response = StreamingHttpResponse(
+            chunked(lines(self.rows(start_date, end_date), self.columns)),
+            content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{self.name}.{encoding}"'
+        return response
+
+
+class BookingExportView(ExportView):
+    name = 'bookings'
+    columns = BOOKING_COLUMNS
+    rows = staticmethod(booking_rows)
+
+
+class CanceledBookingExportView(ExportView):
+    name = 'canceled-bookings'
+    columns = CANCELED_BOOKING_COLUMNS
+    rows = staticmethod(canceled_booking_rows)
+
+
+class OwnerStatsView(APIView):
+    """
+    Booked nights, occupancy, verified/unverified counts and estimated
+    revenue per venue of an owner between ?from= and ?to= (inclusive,
+    defaulting to the current month). Computed by the database and cached
+    for OWNER_STATS_CACHE_TIMEOUT seconds or until the owner's venues or
+    bookings change.
+    """
+    authentication_classes = [CachedUserJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, venueownerid):
+        if request.user.id != venueownerid and not request.user.is_staff:
+            return Response({"detail": "You can only view stats of your own venues."},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        this_month = month_start(date.today())
+        try:
+            start_date = (datetime.strptime(request.query_params['from'], "%Y-%m-%d").date()
+                          if request.query_params.get('from') else this_month)
+            end_date = (datetime.strptime(request.query_params['to'], "%Y-%m-%d").date()
+                        if request.query_params.get('to')
+                        else add_months(this_month, 1) - timedelta(days=1))
+        except ValueError:
+            return Response({"detail": "Invalid date format. Use YYYY-MM-DD."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if start_date > end_date:
+            return Response({"detail": "to must not be before from."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        # Versioned with the owner's venue list, which bookings also bump
+        key = versioned_key('venue-list', venueownerid, 'stats', start_date, end_date)
+        return cached_response(
+            request, key,
+            lambda: Response(owner_stats(venueownerid, start_date, end_date)),
+            timeout=settings.OWNER_STATS_CACHE_TIMEOUT)
+
+
+class VenueAvailabilityView(APIView):
+    """
+    Venues that are free for every day from `start` to `end` (inclusive),
+    optionally narrowed by capacity and price. The availability check is a
+    NOT EXISTS over overlapping bookings, so it runs as one query.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            start_date = datetime.strptime(request.query_params['start'], "%Y-%m-%d").date()
+            end_date = datetime.strptime(request.query_params['end'], "%Y-%m-%d").date()
+        except KeyError:
+            return Response({"detail": "start and end are required."}, status=status.HTTP_400_BAD_REQUEST)
+        except ValueError:
+            return Response({"detail": "Invalid date format. Use YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if start_date > end_date:
+            return Response({"detail": "End date must be after start date."}, status=status.HTTP_400_BAD_REQUEST)
 
-        serializer = VenueSerializer(venues, many=True)
+        filters = {}
+        try:
+            if request.query_params.get('min_capacity'):
+                filters['max_capacity__gte'] = int(request.query_params['min_capacity'])
+            if request.query_params.get('max_price'):
+                filters['min_price__lte'] = Decimal(request.query_params['max_price'])
+            if request.query_params.get('min_price'):
+                filters['max_price__gte'] = Decimal(request.query_params['min_price'])
+            # NaN and Infinity parse, but the ORM rejects them later
+            if any(isinstance(value, Decimal) and not value.is_finite() for value in filters.values()):
+                raise ValueError
+        except (ValueError, InvalidOperation):
+            return Response({"detail": "min_capacity, min_price and max_price must be numbers."}, status=status.HTTP_400_BAD_REQUEST)
+
+        booked = Booking.objects.overlapping(OuterRef('pk'), start_date, end_date)
+        venues = Venue.objects.filter(~Exists(booked), **filters)
+        venues = VenueSummarySerializer.restrict_queryset(venues, request)
+
+        paginator = VenueCursorPagination()
+        page = paginator.paginate_queryset(venues, request, view=self)
+        if page is not None:
+            serializer = VenueSummarySerializer(page, many=True, context={'request': request})
+            return paginator.get_paginated_response(serializer.data)
+
+        serializer = VenueSummarySerializer(venues.order_by('venueid'), many=True,
+                                            context={'request': request})
         return Response(serializer.data)
 
 
+class VenueSearchView(APIView):
+    """Ranked full-text search over venue name, address, features and description."""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            return Response({"detail": "q is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        venues = VenueSummarySerializer.restrict_queryset(search_venues(text), request)
+        paginator = SearchPagination()
+        page = paginator.paginate_queryset(venues, request, view=self)
+        serializer = VenueSummarySerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
+
+
+class VenueCalendarView(APIView):
+    """
+    Occupied days of one venue for `months` months starting at the month of
+    `from`, either as merged date ranges (default) or as one bitmap per
+    month (`?encoding=bitmap`). Cached until a booking of the venue changes,
+    for at most RESPONSE_CACHE_TIMEOUT seconds.
+    """
+    permission_classes = [AllowAny]
+    default_months = 3
+    max_months = 24
+
+    def get(self, request, venueid):
+        try:
+            from_param = request.query_params.get('from')
+            if from_param:
+                start_date = datetime.strptime(from_param[:7], "%Y-%m").date()
+            else:
+                start_date = month_start(date.today())
+            months = int(request.query_params.get('months', self.default_months))
+        except ValueError:
+            return Response({"detail": "Use from=YYYY-MM and an integer months."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not 1 <= months <= self.max_months:
+            return Response({"detail": f"months must be between 1 and {self.max_months}."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            end_date = add_months(start_date, months) - timedelta(days=1)
+        except ValueError:
+            return Response({"detail": "from and months go past the last supported date."}, status=status.HTTP_400_BAD_REQUEST)
+
+        as_bitmap = request.query_params.get('encoding') == 'bitmap'
+        cache_key = versioned_key('venue-calendar', venueid, start_date, months, as_bitmap)
+        payload = cache.get(cache_key)
+        if payload is None:
+            if not Venue.objects.filter(pk=venueid).exists():
+                return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+            ranges = occupied_ranges(venueid, start_date, end_date)
+            payload = {
+                "venueid": venueid,
+                "from": start_date,
+                "to": end_date,
+            }
+            if as_bitmap:
+                payload["months"] = month_bitmaps(ranges, start_date, months)
+            else:
+                payload["ranges"] = [[first, last] for first, last in ranges]
+            cache.set(cache_key, payload, settings.RESPONSE_CACHE_TIMEOUT)
+
+        return Response(payload)
+
+
 class UserBookingView(APIView):
     permission_classes = [AllowAny]
 
@@ -173,24 +463,36 @@ class UserBookingView(APIView):
         # Check if 'id' query parameter is passed to get a single booking
         booking_id = request.query_params.get('id')
         if booking_id:
-            booking = Booking.objects.filter(pk=booking_id).first()
+            booking = Booking.objects.select_related('venue').filter(pk=booking_id).first()
             if booking:
-                serializer = BookingSerializer(booking)
+                serializer = BookingSerializer(booking, context={'request': request})
                 return Response(serializer.data)
             return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
 
+        bookings = BookingSerializer.restrict_queryset(
+            Booking.objects.select_related('venue'), request)
+
         # If user_id is in the path, filter by it
         if user_id:
-            bookings = Booking.objects.filter(user=user_id)
+            bookings = bookings.filter(user=user_id)
         else:
             # Get user_id from query parameters if not in path
             query_user_id = request.query_params.get('user_id')
             if query_user_id:
-                bookings = Booking.objects.filter(user=query_user_id)
-            else:
-                bookings = Booking.objects.all()
+                bookings = bookings.filter(user=query_user_id)
 
-        serializer = BookingSerializer(bookings, many=True)
+        etag = user_bookings_etag(bookings, query_key(request))
+        return conditional_response(request, etag, partial(
+            self.list_bookings, request, bookings))
+
+    def list_bookings(self, request, bookings):
+        paginator = BookingCursorPagination()
+        page = paginator.paginate_queryset(bookings, request, view=self)
+        if page is not None:
+            serializer = BookingSerializer(page, many=True, context={'request': request})
+            return paginator.get_paginated_response(serializer.data)
+
+        serializer = BookingSerializer(bookings, many=True, context={'request': request})
         return Response(serializer.data)
 
     def put(self, request, pk=None):
@@ -207,9 +509,13 @@ class UserBookingView(APIView):
 
 
 class BookingViewSet(viewsets.ModelViewSet):
-    queryset = Booking.objects.all()
+    queryset = Booking.objects.select_related('venue')
     serializer_class = BookingSerializer
     permission_classes = [AllowAny]
+    pagination_class = BookingCursorPagination
+
+    def get_queryset(self):
+        return BookingSerializer.restrict_queryset(super().get_queryset(), self.request)
 
     def get_serializer_class(self):
         if self.action in ['update', 'partial_update']:
@@ -242,6 +548,90 @@ class BookingViewSet(viewsets.ModelViewSet):
         kwargs['partial'] = True
         return self.update(request, *args, **kwargs)
 
+    @action(detail=False, methods=['post'], url_path='verify-bulk',
+            permission_classes=[IsAuthenticated])
+    def verify_bulk(self, request):
+        """
+        Verify (or with "verified": false, un-verify) a list of bookings at
+        the owner's venues in one UPDATE. Each id is reported as "updated",
+        "unchanged" or "not_found"; bookings at other owners' venues count
+        as not found.
+        """
+        serializer = BulkVerifySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        verified = serializer.validated_data['verified']
+
+        owned = Booking.objects.filter(id__in=ids, venue__venueownerid=request.user)
+        with transaction.atomic():
+            current = {
+                booking_id: (venue_id, was_verified)
+                for booking_id, venue_id, was_verified in owned.select_for_update(
+                    of=('self',)).values_list('id', 'venue_id', 'verified')
+            }
+            changed = {booking_id for booking_id, (_, was_verified) in current.items()
+                       if was_verified != verified}
+            if changed:
+                # update() bypasses save(), so updated_at, the daily occupancy
+                # rows and the cached venue responses are handled here
+                owned.filter(id__in=changed).update(
+                    verified=verified, updated_at=timezone.now())
+                VenueDailyOccupancy.objects.filter(booking_id__in=changed).update(
+                    verified=verified)
+
+        for venue_id in {current[booking_id][0] for booking_id in changed}:
+            invalidate_venue(venue_id, request.user.id)
+
+        results = []
+        for booking_id in ids:
+            if booking_id not in current:
+                outcome = 'not_found'
+            elif booking_id in changed:
+                outcome = 'updated'
+            else:
+                outcome = 'unchanged'
+            results.append({"id": booking_id, "status": outcome})
+        return Response({"verified": verified, "results": results})
+
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
+    def cancel(self, request, pk=None):
+        """
+        Record the booking as canceled (with an optional "reason") and delete
+        it in one transaction. Open to the booker and the venue's owner.
+        """
+        try:
+            booking_id = int(pk)
+        except ValueError:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        serializer = CancelReasonSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        canceled = cancel_bookings(request.user, [booking_id], serializer.validated_data.get('reason'))
+        if not canceled:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(CanceledBookingSerializer(canceled[booking_id]).data,
+                        status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'], url_path='cancel-bulk',
+            permission_classes=[IsAuthenticated])
+    def cancel_bulk(self, request):
+        """
+        Cancel many bookings in one transaction. Ids the caller may not
+        cancel, or that do not exist, are reported as "not_found".
+        """
+        serializer = CancelBookingsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        canceled = cancel_bookings(request.user, ids, serializer.validated_data.get('reason'))
+
+        results = []
+        for booking_id in ids:
+            if booking_id in canceled:
+                results.append({"id": booking_id, "status": "canceled",
+                                "canceled_id": canceled[booking_id].id})
+            else:
+                results.append({"id": booking_id, "status": "not_found"})
+        return Response({"results": results})
+
 
 class VenueListCreate(viewsets.ModelViewSet):
     queryset = Venue.objects.all()
@@ -253,57 +643,45 @@ class KhaltiPaymentView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        user_id = request.data.get("user")
-        venue_id = request.data.get("venue")
-        start_date = request.data.get("start_date")
-        end_date = request.data.get("end_date")
-        # in paisa (eg: Rs 100 = 10000 paisa)
-        amount = request.data.get("amount")
-
-        if not all([user_id, venue_id, start_date, end_date, amount]):
-            return Response({"detail": "Missing fields"}, status=status.HTTP_400_BAD_REQUEST)
-
         try:
-            # Parse the dates
-            start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
-            end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
-        except ValueError:
-            return Response({"detail": "Invalid date format. Use YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+            payment = parse_payment_request(request.data)
+            payment_url = khalti.initiate_payment(
+                request.user, payment, request.headers.get('Idempotency-Key'))
+        except (PaymentRequestError, KhaltiError) as e:
+            return Response({"detail": e.detail}, status=e.status_code)
+        return Response({"payment_url": payment_url})
 
-        # Check if venue is already booked for any overlapping dates
-        overlapping_bookings = Booking.objects.filter(
-            venue_id=venue_id,
-            start_date__lte=end_date_obj,
-            end_date__gte=start_date_obj
-        ).exists()
 
-        if overlapping_bookings:
-            return Response(
-                {"detail": "Venue already booked for the selected dates."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncKhaltiPaymentView(View):
+    """
+    Async twin of KhaltiPaymentView for ASGI deployments (backend/asgi.py).
+    The worker is free while Khalti answers, outbound calls share a pooled
+    client with connect/read timeouts, and in-flight calls are capped.
+    """
 
-        payload = {
-            "return_url": "http://localhost:5173/payment-success",  # after payment where to go
-            "website_url": "http://localhost:5173",
-            "amount": amount,
-            "purchase_order_id": f"order-{user_id}-{venue_id}",
-            "purchase_order_name": "Venue Booking",
-            "customer_info": {
-                "name": request.user.username,
-                "email": request.user.email,
-                "phone": "9800000000",  # Dummy phone, make dynamic if needed
-            }
-        }
+    async def post(self, request):
+        try:
+            auth = await sync_to_async(JWTAuthentication().authenticate)(request)
+        except AuthenticationFailed as e:
+            return JsonResponse({"detail": str(e.detail)}, status=status.HTTP_401_UNAUTHORIZED)
+        if auth is None:
+            return JsonResponse({"detail": "Authentication credentials were not provided."},
+                                status=status.HTTP_401_UNAUTHORIZED)
+        user = auth[0]
 
-        khalti_url = "https://a.khalti.com/api/v2/epayment/initiate/"
-        headers = {
-            "Authorization": f"Key {settings.KHALTI_SECRET_KEY}"
-        }
-        response = requests.post(khalti_url, json=payload, headers=headers)
+        try:
+            data = json.loads(request.body or b"{}")
+            if not isinstance(data, dict):
+                raise ValueError
+        except ValueError:
+            return JsonResponse({"detail": "Request body must be a JSON object."},
+                                status=status.HTTP_400_BAD_REQUEST)
 
-        if response.status_code == 200:
-            data = response.json()
-            return Response({"payment_url": data["payment_url"]})
-        else:
-            return Response({"detail": "Khalti payment initiation failed"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            payment = parse_payment_request(data)
+            payment_url = await khalti.ainitiate_payment(
+                user, payment, request.headers.get('Idempotency-Key'))
+        except (PaymentRequestError, KhaltiError) as e:
+            return JsonResponse({"detail": e.detail}, status=e.status_code)
+        return JsonResponse({"payment_url": payment_url})
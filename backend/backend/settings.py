@@ -41,11 +41,23 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Cursor pagination on list endpoints is opt-in via ?cursor= / ?page_size=
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 500
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
+    # Embed username/email so read-only views can skip the User query;
+    # refreshing re-reads them from the User
+    "TOKEN_OBTAIN_SERIALIZER": "api.authentication.ClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "api.authentication.ClaimsTokenRefreshSerializer",
 }
 
+# Seconds api.authentication.CachedUserJWTAuthentication may reuse a loaded
+# User, i.e. how long a demoted or deactivated user keeps access to its views
+JWT_USER_CACHE_TIMEOUT = 60
+
 
 # Application definition
 
@@ -56,6 +68,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     "api",
     "rest_framework",
     "corsheaders",
@@ -65,6 +78,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so it also counts the queries made by the middleware below
+    'api.middleware.QueryStatsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -96,6 +111,17 @@ TEMPLATES = [
 WSGI_APPLICATION = 'backend.wsgi.application'
 
 KHALTI_SECRET_KEY = 'd9bffd15501b47fbac8efd37607ff894'
+# Point this at `manage.py fake_khalti` to load-test payments offline
+KHALTI_INITIATE_URL = os.getenv(
+    'KHALTI_INITIATE_URL', 'https://a.khalti.com/api/v2/epayment/initiate/')
+KHALTI_CONNECT_TIMEOUT = 3  # seconds
+KHALTI_READ_TIMEOUT = 10  # seconds
+KHALTI_POOL_SIZE = 20  # keep-alive connections per worker
+KHALTI_MAX_CONCURRENCY = 50  # in-flight initiations per async worker
+KHALTI_QUEUE_TIMEOUT = 1  # seconds to wait for a free slot before 503
+# Repeated initiations of the same booking within this many seconds reuse
+# the first payment_url instead of calling Khalti again
+PAYMENT_INTENT_TTL = 30 * 60
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
@@ -113,6 +139,41 @@ DATABASES = {
 }
 
 
+# Cache used for venue responses and calendars. Local memory by default; point
+# CACHE_BACKEND/CACHE_LOCATION at e.g. a file or Redis cache to share it.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'venue-book'),
+    }
+}
+
+# Seconds a cached venue response may live; signals invalidate it earlier
+RESPONSE_CACHE_TIMEOUT = 300
+# Owner dashboards are recomputed at least this often (seconds)
+OWNER_STATS_CACHE_TIMEOUT = 60
+
+# Per-request SQL count/time headers and logging (api.middleware.QueryStatsMiddleware)
+QUERY_STATS = os.getenv('QUERY_STATS', '1' if DEBUG else '0') == '1'
+# Requests above either limit are logged at WARNING instead of DEBUG
+QUERY_STATS_WARN_COUNT = 20
+QUERY_STATS_WARN_MS = 200
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.queries': {
+            'handlers': ['console'],
+            'level': os.getenv('QUERY_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -0,0 +1,71 @@
+"""
+Production settings: DJANGO_SETTINGS_MODULE=backend.settings_production
+
+Everything not overridden here comes from backend/settings.py. Secrets and
+hosts are read from the environment; DJANGO_SECRET_KEY and
+DJANGO_ALLOWED_HOSTS are required.
+
+Database connections are either
+  * pooled (DB_POOL=1, the default when psycopg 3 and psycopg_pool are
+    installed): each worker process keeps between DB_POOL_MIN_SIZE and
+    DB_POOL_MAX_SIZE open connections and requests borrow one, or
+  * persistent (DB_POOL=0): each worker thread keeps its connection for
+    DB_CONN_MAX_AGE seconds, checked with CONN_HEALTH_CHECKS before reuse.
+Keep workers x DB_POOL_MAX_SIZE below PostgreSQL's max_connections.
+"""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+
+DEBUG = os.getenv('DJANGO_DEBUG', '') == '1'
+
+# No development fallbacks for these: a missing value is a deployment error
+SECRET_KEY = os.getenv('DJANGO_SECRET_KEY')
+if not SECRET_KEY:
+    raise ImproperlyConfigured("Set DJANGO_SECRET_KEY for production.")
+ALLOWED_HOSTS = [host.strip() for host in os.getenv('DJANGO_ALLOWED_HOSTS', '').split(',') if host.strip()]
+if not ALLOWED_HOSTS:
+    raise ImproperlyConfigured("Set DJANGO_ALLOWED_HOSTS to a comma-separated list of host names.")
+QUERY_STATS = os.getenv('QUERY_STATS', '') == '1'
+
+
+def _pool_available():
+    try:
+        import psycopg  # noqa: F401
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+DB_POOL = os.getenv('DB_POOL', '1' if _pool_available() else '0') == '1'
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.getenv('DB_NAME', DATABASES['default']['NAME']),  # noqa: F405
+        'USER': os.getenv('DB_USER', DATABASES['default']['USER']),  # noqa: F405
+        'PASSWORD': os.getenv('DB_PASSWORD', DATABASES['default']['PASSWORD']),  # noqa: F405
+        'HOST': os.getenv('DB_HOST', DATABASES['default']['HOST']),  # noqa: F405
+        'PORT': os.getenv('DB_PORT', DATABASES['default']['PORT']),  # noqa: F405
+        # Test a reused connection (or a pooled one before lending it out)
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
+    }
+}
+
+if DB_POOL:
+    # The pool owns the connections, so Django must not keep its own
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+        'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+        # Seconds a request waits for a free connection before erroring
+        'timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+        'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', 300)),
+    }
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv('DB_CONN_MAX_AGE', 600))